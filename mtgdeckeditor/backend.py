@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Where card records, images and name completions come from.
+
+The backend is chosen by the MTG_DECK_EDITOR_SERVER environment variable:
+if set, Gatherer requests go to that URL instead, e.g. to the fixture
+server in mtgdeckeditor.mockserver. A local card database, if imported,
+answers record lookups and completions in front of either.
+"""
+
+from __future__ import with_statement
+
+import os
+import re
+import json
+
+from abc import ABCMeta, abstractmethod
+
+try:
+    from urllib.parse import quote
+except ImportError:
+    from urllib import quote
+
+from mtgdeckeditor import instrument
+from mtgdeckeditor.network import get
+from mtgdeckeditor.record import extract_record, parse_record
+
+GATHERER_URL = 'http://gatherer.wizards.com'
+TYPEAHEAD_URL = 'https://api.deckbrew.com/mtg/cards/typeahead?q=%s'
+
+
+# abc.ABC, spelled so that it works on Python 2 as well
+_ABC = ABCMeta('ABC', (object,), {})
+
+
+class Backend(_ABC):
+    """Card data source; every method may block on I/O.
+
+    Subclasses implement ``get_record`` and ``fetch_image``.
+    ``get_record`` returns None and ``complete`` and ``typeahead_url``
+    return None if the backend cannot answer.
+    """
+
+    @abstractmethod
+    def get_record(self, query):
+        """The CardRecord of query, or None."""
+
+    @abstractmethod
+    def fetch_image(self, query):
+        """The compressed image of query, as bytes."""
+
+    def complete(self, prefix, limit):
+        """Names starting with prefix, if they can be had without waiting
+        on the network."""
+        return None
+
+    def typeahead_url(self, prefix):
+        """URL of a JSON list of ``{"name": ...}`` objects, which the GUI
+        loads asynchronously."""
+        return None
+
+
+class GathererBackend(Backend):
+    """Scrapes Gatherer, or a server that looks like it."""
+
+    def __init__(self, url=GATHERER_URL, typeahead_url=TYPEAHEAD_URL):
+        self.url = url.rstrip('/')
+        self.typeahead = typeahead_url
+
+    def details_url(self, query):
+        # handle split cards
+        return '%s/Pages/Card/Details.aspx?name=%s' % (
+            self.url, re.sub("(.*) // (.*)", r"[\1]+[//]+[\2]", query))
+
+    def image_url(self, query):
+        image_url = '%s/Handlers/Image.ashx?type=card&name=%s' % (
+            self.url, query)
+        # rotate split cards
+        if '//' in query:
+            image_url = '%s&options=rotate90' % image_url
+        return image_url
+
+    @instrument.timed('gatherer.details', gauge='network')
+    def fetch_details(self, query):
+        return get(self.details_url(query)).content
+
+    def get_record(self, query):
+        html = self.fetch_details(query)
+        record = extract_record(html.decode('utf-8', 'replace'), query)
+        if record is None:
+            # not the page layout extract_record knows; let html5lib try
+            record = parse_record(parse_html(html), query)
+        return record
+
+    @instrument.timed('gatherer.image', gauge='network')
+    def fetch_image(self, query):
+        return get(self.image_url(query)).content
+
+    def typeahead_url(self, prefix):
+        return self.typeahead % quote(prefix.encode('utf-8'))
+
+
+class DatabaseBackend(Backend):
+    """Answers from a local CardDatabase, and asks ``fallback`` for
+    whatever the database does not have, including all images."""
+
+    def __init__(self, database, fallback):
+        self.database = database
+        self.fallback = fallback
+
+    def get_record(self, query):
+        record = self.database.get_record(query)
+        if record is None:
+            record = self.fallback.get_record(query)
+        return record
+
+    def fetch_image(self, query):
+        return self.fallback.fetch_image(query)
+
+    def complete(self, prefix, limit):
+        return self.database.complete(prefix, limit)
+
+    def typeahead_url(self, prefix):
+        return self.fallback.typeahead_url(prefix)
+
+
+@instrument.timed('html5lib.parse')
+def parse_html(html):
+    from html5lib import parse
+
+    return parse(html, treebuilder='etree', namespaceHTMLElements=False)
+
+
+def parse_typeahead(content):
+    if isinstance(content, bytes):
+        content = content.decode('utf-8')
+    return [x['name'] for x in json.loads(content)]
+
+
+def default_backend(database=None):
+    server = os.environ.get('MTG_DECK_EDITOR_SERVER')
+    if server:
+        backend = GathererBackend(server, server.rstrip('/') + '/typeahead?q=%s')
+    else:
+        backend = GathererBackend()
+    if database is not None:
+        backend = DatabaseBackend(database, backend)
+    return backend
@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Benchmarks of card resolution, deck loading, curves and hand draws.
+
+Usage: python -m mtgdeckeditor.benchmark [options] [BENCHMARK...]
+
+Cards are served by the fixture server of mtgdeckeditor.mockserver, from
+a recorded fixture directory or from synthetic cards generated for the
+run, so results do not depend on the network. Every benchmark prints one
+JSON object per line with its throughput, latency percentiles and peak
+memory; save the output of two commits and compare them.
+"""
+
+from __future__ import with_statement
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# deck sizes, in lines, for the load benchmark
+DEFAULT_SIZES = [60, 1000, 20000]
+# distinct synthetic cards served
+DEFAULT_CARDS = 300
+DEFAULT_REPEAT = 1000
+BENCHMARKS = ['get_card', 'parse', 'load', 'curve', 'library']
+
+ROW = ('<div id="ctl00_ctl00_ctl00_MainContent_SubContent_SubContent_%sRow">'
+       '<div class="label">%s:</div><div class="value">%s</div></div>')
+# Gatherer pages are mostly navigation, scripts and ads around the card
+PADDING = (u'<script type="text/javascript">%s</script><ul class="nav">%s</ul>' % (
+    u'var x = {};\n'*400,
+    u''.join(u'<li class="item"><a href="/Pages/Search/Default.aspx?set=%d">'
+             u'<img src="/Handlers/Image.ashx?set=%d" alt="">Set %d</a></li>'
+             % (i, i, i) for i in range(600))))
+SYMBOLS = [u'White', u'Blue', u'Black', u'Red', u'Green', u'Two or Red',
+           u'Phyrexian Blue', u'White or Blue']
+
+
+def synthetic_page(name, types, mana_cost):
+    cmc = 0
+    for s in mana_cost:
+        try:
+            cmc += int(s)
+        except ValueError:
+            cmc += 1
+    images = ''.join('<img alt="%s" src="x.gif">' % s for s in mana_cost)
+    return (u'<!DOCTYPE html><html><head><title>%s</title></head><body>'
+            u'%s<div class="cardDetails">%s%s%s%s</div></body></html>' % (
+                name, PADDING, ROW % ('name', 'Card Name', name),
+                ROW % ('mana', 'Mana Cost', images),
+                ROW % ('type', 'Types', types),
+                ROW % ('cmc', 'Converted Mana Cost', cmc))).encode('utf-8')
+
+
+def synthetic_fixtures(fixtures, count, seed=0):
+    """Write count synthetic cards, about two fifths of them lands."""
+    rng = random.Random(seed)
+    names = []
+    for i in range(count):
+        name = u'Synthetic Card %05d' % i
+        if rng.random() < 0.4:
+            types, mana_cost = u'Basic Land — Island', []
+        else:
+            types = u'Creature — Elf'
+            mana_cost = [str(rng.randint(1, 4))] + \
+                [rng.choice(SYMBOLS) for j in range(rng.randint(0, 3))]
+        fixtures.write(name, '.html', synthetic_page(name, types, mana_cost))
+        # about the size of a Gatherer card image
+        fixtures.write(name, '.jpg', os.urandom(30*1024))
+        fixtures.names[name.lower()] = name
+        names.append(name)
+    return names
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = int(round(fraction*(len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+class Measurement:
+    """Timings of the operations of one benchmark run."""
+
+    def __init__(self, name, trace_memory=False, **params):
+        self.name = name
+        self.params = params
+        self.trace_memory = trace_memory and tracemalloc is not None
+        self.times = []
+
+    def __enter__(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.time() - self.start
+        self.peak = None
+        if self.trace_memory:
+            self.peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def time(self, function, *args):
+        start = time.time()
+        result = function(*args)
+        self.times.append(time.time() - start)
+        return result
+
+    def result(self):
+        times = sorted(self.times)
+        result = {
+            'benchmark': self.name,
+            'ops': len(times),
+            'seconds': self.seconds,
+            'throughput': len(times)/self.seconds if self.seconds else None,
+            'p50_ms': None, 'p90_ms': None, 'p99_ms': None, 'max_ms': None,
+            'peak_bytes': self.peak,
+        }
+        if times:
+            result.update({
+                'p50_ms': 1000*percentile(times, 0.5),
+                'p90_ms': 1000*percentile(times, 0.9),
+                'p99_ms': 1000*percentile(times, 0.99),
+                'max_ms': 1000*times[-1],
+            })
+        if resource is not None:
+            # high-water mark of the whole process, in KiB on Linux
+            result['maxrss'] = resource.getrusage(
+                resource.RUSAGE_SELF).ru_maxrss
+        result.update(self.params)
+        return result
+
+
+class Bench:
+    def __init__(self, args, names, url, scratch, out):
+        from mtgdeckeditor.backend import GathererBackend
+
+        self.args = args
+        self.names = names
+        self.backend = GathererBackend(url, url + '/typeahead?q=%s')
+        self.scratch = scratch
+        self.stores = 0
+        self.out = out
+
+    def emit(self, measurement):
+        self.out.write(json.dumps(measurement.result(), sort_keys=True) + '\n')
+        self.out.flush()
+
+    def measure(self, name, **params):
+        return Measurement(name, self.args.trace_memory, **params)
+
+    def card_cache(self, store=None):
+        """A CardCache of its own, with a new DiskStore unless given."""
+        from mtgdeckeditor.cache import CardCache, DiskStore
+        from mtgdeckeditor.card import Card
+
+        if store is None:
+            self.stores += 1
+            store = DiskStore(os.path.join(
+                self.scratch, 'store%d.sqlite' % self.stores))
+        return CardCache(Card, store, backend=self.backend)
+
+    def deck(self, lines, seed=0):
+        rng = random.Random(seed)
+        return [(rng.randint(1, 4), rng.choice(self.names))
+                for i in range(lines)]
+
+    def bench_get_card(self):
+        cache = self.card_cache()
+        with self.measure('get_card', phase='cold',
+                          latency=self.args.latency) as m:
+            for name in self.names:
+                m.time(cache.get, name)
+        self.emit(m)
+
+        with self.measure('get_card', phase='warm') as m:
+            for i in range(self.args.repeat):
+                for name in self.names:
+                    m.time(cache.get, name)
+        self.emit(m)
+
+        # a new session: records come from the disk store
+        cache = self.card_cache(cache.store)
+        with self.measure('get_card', phase='store') as m:
+            for name in self.names:
+                m.time(cache.get, name)
+        self.emit(m)
+
+    def bench_parse(self):
+        """Details pages to records: html5lib and parse_record, the
+        fallback, against extract_record."""
+        from mtgdeckeditor.backend import parse_html
+        from mtgdeckeditor.record import extract_record, parse_record
+
+        def tree(html, name):
+            return parse_record(parse_html(html), name)
+
+        def fast(html, name):
+            return extract_record(html.decode('utf-8'), name)
+
+        pages = [(self.backend.fetch_details(name), name)
+                 for name in self.names]
+        page_bytes = sum(len(html) for html, name in pages)//len(pages)
+        for phase, function in (('html5lib', tree), ('fast', fast)):
+            with self.measure('parse', phase=phase,
+                              page_bytes=page_bytes) as m:
+                for html, name in pages:
+                    m.time(function, html, name)
+            self.emit(m)
+
+    def load(self, cache, filename):
+        """The deck file path of the GUI, minus the list store."""
+        from mtgdeckeditor.deckfile import iter_deck
+        from mtgdeckeditor.loader import DeckLoader
+        from mtgdeckeditor.stats import DeckStats
+
+        def post(job, rows, done, total, finished):
+            # what DeckModel.extend does to the statistics
+            for amount, name in rows:
+                stats.insert_row(len(stats.rows), amount, name)
+            if finished:
+                done_event.set()
+
+        stats = DeckStats()
+        done_event = threading.Event()
+        loader = DeckLoader(cache.get)
+        loader.load(((entry.amount, entry.name)
+                     for entry in iter_deck(filename)
+                     if not entry.sideboard), post)
+        done_event.wait()
+        return stats
+
+    def bench_load(self):
+        for lines in self.args.sizes:
+            filename = os.path.join(self.scratch, 'deck%d.dec' % lines)
+            with open(filename, 'w') as deckfile:
+                for amount, name in self.deck(lines):
+                    deckfile.write('%d %s\n' % (amount, name))
+            for phase in ('cold', 'warm'):
+                if phase == 'cold':
+                    cache = self.card_cache()
+                with self.measure('load', phase=phase, lines=lines,
+                                  latency=self.args.latency) as m:
+                    m.time(self.load, cache, filename)
+                m.params['lines_per_second'] = lines/m.seconds
+                self.emit(m)
+
+    def bench_curve(self):
+        from mtgdeckeditor.curve import curve_matrix
+
+        cache = self.card_cache()
+        for lines in (60, len(self.names)):
+            deck = [(amount, cache.get(name))
+                    for amount, name in self.deck(lines)]
+            with self.measure('curve', lines=lines) as m:
+                for i in range(self.args.repeat):
+                    m.time(curve_matrix, deck)
+            self.emit(m)
+
+    def bench_library(self):
+        from mtgdeckeditor.library import Library
+
+        def draw_hand(rows):
+            library = Library(rows, cache.get)
+            library.shuffle()
+            return [library.draw() for i in range(7)]
+
+        cache = self.card_cache()
+        rows = self.deck(20)
+        for amount, name in rows:
+            cache.get(name)
+        with self.measure('library', cards=sum(r[0] for r in rows)) as m:
+            for i in range(self.args.repeat):
+                m.time(draw_hand, rows)
+        self.emit(m)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m mtgdeckeditor.benchmark',
+        description='Print benchmark results as JSON, one line each.')
+    parser.add_argument('benchmarks', metavar='BENCHMARK', nargs='*',
+                        help='any of %s; all by default' % ', '.join(BENCHMARKS))
+    parser.add_argument('-f', '--fixtures',
+                        help='recorded fixture directory, '
+                             'see mtgdeckeditor.mockserver')
+    parser.add_argument('-c', '--cards', type=int, default=DEFAULT_CARDS,
+                        help='number of synthetic cards')
+    parser.add_argument('-l', '--latency', type=float, default=0,
+                        help='seconds the fixture server waits per request')
+    parser.add_argument('-s', '--sizes', type=int, nargs='+',
+                        default=DEFAULT_SIZES, help='deck lines to load')
+    parser.add_argument('-r', '--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='repetitions of the in-memory benchmarks')
+    parser.add_argument('-m', '--trace-memory', action='store_true',
+                        help='trace peak allocations; slows down timings')
+    args = parser.parse_args(argv)
+    for benchmark in args.benchmarks:
+        if benchmark not in BENCHMARKS:
+            parser.error('unknown benchmark %s' % benchmark)
+
+    scratch = tempfile.mkdtemp(prefix='mtg-deck-editor-benchmark-')
+    # keep the user's caches out of it; set before anything reads them
+    os.environ['XDG_CACHE_HOME'] = os.path.join(scratch, 'cache')
+    os.environ['XDG_DATA_HOME'] = os.path.join(scratch, 'data')
+    try:
+        from mtgdeckeditor.mockserver import Fixtures, FixtureServer
+
+        if args.fixtures is None:
+            fixtures = Fixtures(os.path.join(scratch, 'fixtures'))
+            os.makedirs(fixtures.path)
+            names = synthetic_fixtures(fixtures, args.cards)
+        else:
+            fixtures = Fixtures(args.fixtures)
+            names = sorted(fixtures.names.values())
+        if not names:
+            parser.error('no fixtures')
+
+        server = FixtureServer(('localhost', 0), fixtures, args.latency)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        url = 'http://localhost:%d' % server.server_address[1]
+
+        bench = Bench(args, names, url, scratch, sys.stdout)
+        for benchmark in args.benchmarks or BENCHMARKS:
+            getattr(bench, 'bench_' + benchmark)()
+        server.shutdown()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
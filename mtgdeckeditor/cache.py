@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+from __future__ import with_statement
+
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import xdg.BaseDirectory
+
+import os
+import pickle
+import sqlite3
+import threading
+
+from mtgdeckeditor.record import clean_name, normalize
+
+# memory budget of the in-memory tier, in bytes
+DEFAULT_MEMORY_BUDGET = 64*1024*1024
+
+
+def cache_path(filename):
+    return os.path.join(
+        xdg.BaseDirectory.save_cache_path('mtg-deck-editor'), filename)
+
+
+class DiskStore:
+    """Persistent store of card records and raw image bytes.
+
+    Records and images live in separate tables, so a card's metadata can
+    be loaded without touching its image.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def connection(self):
+        """Opened on first use; callers must hold the lock."""
+        if self._connection is None:
+            # several processes may share the store, see the analyze command
+            connection = sqlite3.connect(self.path, timeout=30,
+                                         check_same_thread=False)
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS card_records '
+                '(query TEXT PRIMARY KEY, record BLOB)')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS card_images '
+                '(query TEXT PRIMARY KEY, image BLOB)')
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _get(self, table, query):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT * FROM %s WHERE query = ?' % table,
+                (query,)).fetchone()
+        if row is None:
+            return None
+        return bytes(row[1])
+
+    def _put(self, table, query, data):
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO %s VALUES (?, ?)' % table,
+                (query, sqlite3.Binary(data)))
+            self.connection.commit()
+
+    def _items(self, table):
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT * FROM %s' % table).fetchall()
+        return [(query, bytes(data)) for query, data in rows]
+
+    def records(self):
+        """All (query, record) pairs, see mtgdeckeditor.pack."""
+        return [(query, pickle.loads(data))
+                for query, data in self._items('card_records')]
+
+    def raw_images(self):
+        return self._items('card_images')
+
+    def get_record(self, query):
+        data = self._get('card_records', query)
+        if data is None:
+            return None
+        return pickle.loads(data)
+
+    def put_record(self, query, record):
+        self._put('card_records', query, pickle.dumps(record, 2))
+
+    def get_image(self, query):
+        return self._get('card_images', query)
+
+    def has_image(self, query):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT 1 FROM card_images WHERE query = ?',
+                (query,)).fetchone()
+        return row is not None
+
+    def put_image(self, query, image_raw):
+        self._put('card_images', query, image_raw)
+
+
+class CardCache:
+    """Size-bounded LRU of card objects in front of an optional DiskStore.
+
+    ``factory(query, record=None, store=None, backend=None)`` builds a
+    card, fetching its record from the backend if none was found in the
+    store.
+    Cards report their footprint via ``nbytes``, which is measured once,
+    when a card enters the cache; the least recently used cards are
+    evicted once the total exceeds ``budget``. Decoded images are kept
+    apart, in an ImageCache.
+
+    Cards are keyed by their normalized name, see record.normalize, and
+    every other query a card was resolved from is remembered as an alias,
+    so variant spellings share one card and one load. The store is keyed
+    by normalized query. Concurrent lookups of a card that
+    is not in memory yet share a single load; ``counters`` records how many
+    lookups were served from memory, loaded, or coalesced into a pending
+    load.
+    """
+
+    def __init__(self, factory, store=None, budget=DEFAULT_MEMORY_BUDGET,
+                 backend=None):
+        self.factory = factory
+        self.store = store
+        self.backend = backend
+        self.budget = budget
+        self.size = 0
+        self.lock = threading.Lock()
+        self.cards = OrderedDict()
+        self.sizes = {}
+        # normalized query -> normalized name of the card it resolved to
+        self.aliases = {}
+        # futures of the cards being loaded, by key
+        self.pending = {}
+        self.counters = {'hits': 0, 'loads': 0, 'coalesced': 0}
+
+    def __contains__(self, query):
+        with self.lock:
+            return self._key(query) in self.cards
+
+    def __len__(self):
+        with self.lock:
+            return len(self.cards)
+
+    def _key(self, query):
+        key = normalize(query)
+        return self.aliases.get(key, key)
+
+    def peek(self, query):
+        """The card for query if it is held in memory, without loading it."""
+        with self.lock:
+            return self.cards.get(self._key(query))
+
+    def canonical_name(self, query):
+        """The card name query resolved to, if known, else query cleaned up."""
+        card = self.peek(query)
+        if card is None:
+            return clean_name(query)
+        return card.name
+
+    def get(self, query):
+        with self.lock:
+            key = self._key(query)
+            card = self.cards.pop(key, None)
+            if card is not None:
+                self.cards[key] = card
+                self.counters['hits'] += 1
+                return card
+            future = self.pending.get(key)
+            waiting = future is not None
+            if waiting:
+                self.counters['coalesced'] += 1
+            else:
+                future = self.pending[key] = Future()
+                self.counters['loads'] += 1
+        if waiting:
+            return future.result()
+
+        try:
+            card = self.load(query)
+        except BaseException as error:
+            with self.lock:
+                del self.pending[key]
+            future.set_exception(error)
+            raise
+        with self.lock:
+            del self.pending[key]
+            name = normalize(card.name)
+            # another spelling of the same card may have been loaded already
+            card = self.cards.pop(name, card)
+            self.cards[name] = card
+            self._measure(name, card)
+            if key != name:
+                self.aliases[key] = name
+        future.set_result(card)
+        return card
+
+    def load(self, query):
+        query = clean_name(query)
+        key = normalize(query)
+        record = None
+        if self.store is not None:
+            record = self.store.get_record(key)
+        fetched = record is None
+        card = self.factory(query, record=record, store=self.store,
+                            backend=self.backend)
+        if fetched and self.store is not None:
+            self.store.put_record(key, card.record)
+            name = normalize(card.name)
+            if name != key:
+                # so that looking up the canonical name needs no fetch either
+                self.store.put_record(name, card.record)
+        return card
+
+    def put(self, card):
+        key = normalize(card.name)
+        with self.lock:
+            self.cards.pop(key, None)
+            self.cards[key] = card
+            self._measure(key, card)
+
+    def _measure(self, query, card):
+        nbytes = card.nbytes
+        self.size += nbytes - self.sizes.get(query, 0)
+        self.sizes[query] = nbytes
+        # always keep the most recent card, even if it exceeds the budget
+        while self.size > self.budget and len(self.cards) > 1:
+            evicted, _ = self.cards.popitem(last=False)
+            self.size -= self.sizes.pop(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.cards.clear()
+            self.sizes.clear()
+            self.aliases.clear()
+            self.size = 0
+
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#       
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+from __future__ import with_statement
+
+import sys
+import threading
+
+from mtgdeckeditor import instrument
+from mtgdeckeditor.backend import default_backend
+from mtgdeckeditor.cache import CardCache
+from mtgdeckeditor.database import default_database
+from mtgdeckeditor.images import ImageCache, THUMBNAIL_SIZE
+from mtgdeckeditor.pack import default_store
+from mtgdeckeditor.record import normalize
+
+
+@instrument.timed('get_card', gauge='get_card')
+def get_card(query):
+    return card_cache.get(query)
+
+
+class Card:
+    def __init__(self, query, record=None, store=None, backend=None):
+        self.query = query
+        self.split = '//' in self.query
+        self.store = store
+        self.backend = backend or card_backend
+        self.image_lock = threading.Lock()
+
+        if record is None:
+            record = self.backend.get_record(self.query)
+        self.record = record
+
+    def fetch_image(self):
+        return self.backend.fetch_image(self.query)
+
+    def image_raw(self):
+        """The compressed card image, fetched on first access."""
+        with self.image_lock:
+            image_raw = None
+            if self.store is not None:
+                image_raw = self.store.get_image(normalize(self.query))
+            if image_raw is None:
+                image_raw = self.fetch_image()
+                if self.store is not None:
+                    self.store.put_image(normalize(self.query), image_raw)
+            return image_raw
+
+    def has_image(self):
+        """Whether the compressed image is in the store already."""
+        return self.store is not None and \
+            self.store.has_image(normalize(self.query))
+
+    @property
+    def pixbuf(self):
+        """The full size card image, decoded through image_cache."""
+        return image_cache.get(self)
+
+    def thumbnail(self, size=THUMBNAIL_SIZE):
+        return image_cache.get(self, size)
+
+    @property
+    def nbytes(self):
+        """Approximate memory footprint, used by the card cache budget.
+
+        Counts the card, its attributes and lock, and the record with its
+        strings and containers. Mana symbols are shared between records
+        and the store and backend between cards, so neither is counted.
+        Decoded images are accounted for by image_cache instead.
+        """
+        nbytes = sum(sys.getsizeof(value) for value in (
+            self, self.__dict__, self.image_lock, self.query))
+        record = self.record
+        if record is not None:
+            nbytes += sum(sys.getsizeof(value) for value in (
+                record, record.query, record.name, record.mana_cost,
+                record.mana_costs, record.types))
+        return nbytes
+
+    @property
+    def name(self):
+        return self.record.name
+
+    @property
+    def mana_cost(self):
+        return self.record.mana_cost
+
+    @property
+    def mana_costs(self):
+        return self.record.mana_costs
+
+    @property
+    def types(self):
+        return self.record.types
+
+    @property
+    def cmc(self):
+        return self.record.cmc
+
+    @property
+    def color(self):
+        return self.record.color
+
+    def __str__(self):
+        return "%s | %s | %s" % (self.name, self.types, self.cmc)
+
+
+card_database = default_database()
+card_backend = default_backend(card_database)
+card_cache = CardCache(Card, default_store(), backend=card_backend)
+image_cache = ImageCache()
+
+
+def cache_stats():
+    stats = dict(card_cache.counters)
+    lookups = sum(stats.values())
+    stats['hit_rate'] = float(stats['hits'])/lookups if lookups else 0.0
+    stats['cards'] = len(card_cache)
+    stats['bytes'] = card_cache.size
+    stats['images'] = len(image_cache)
+    stats['image_bytes'] = image_cache.size
+    return stats
+
+instrument.register('cache', cache_stats)
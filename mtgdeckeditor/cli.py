@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Headless deck analysis.
+
+Usage: mtg-deck-editor analyze [-j JOBS] DECKFILE...
+
+Prints one JSON object with card counts, colors and the mana curve of
+the main deck, and the sideboard card counts, per deck file, in the
+order given. A file that cannot be read gets an object with its error
+instead, and the exit status is 1.
+"""
+
+from __future__ import with_statement
+
+from multiprocessing import Pool, cpu_count
+
+import sys
+import json
+import argparse
+
+from mtgdeckeditor.curve import COLORS
+from mtgdeckeditor.deckfile import iter_deck
+from mtgdeckeditor.stats import DeckStats
+
+
+def analyze_deck(filename):
+    # imported per process, so that no database connection crosses a fork
+    from mtgdeckeditor.card import get_card
+
+    # rows are keyed by the resolved card name, as the deck loader does,
+    # so different spellings of a card count as one
+    stats = DeckStats()
+    deck = {}
+    sideboard = {}
+    errors = {}
+    try:
+        for entry in iter_deck(filename):
+            try:
+                card = get_card(entry.name)
+            except Exception as error:
+                errors[entry.name] = str(error)
+                continue
+            if entry.sideboard:
+                sideboard[card.name] = \
+                    sideboard.get(card.name, 0) + entry.amount
+            elif card.name in deck:
+                index = deck[card.name]
+                amount = stats.rows[index][0] + entry.amount
+                stats.change_row(index, amount, card.name)
+            else:
+                deck[card.name] = len(stats.rows)
+                stats.insert_row(len(stats.rows), entry.amount, card.name)
+                stats.resolve(card.name, card)
+    except (EnvironmentError, SyntaxError, ValueError) as error:
+        # SyntaxError covers XML parse errors of .dek files
+        return {'file': filename, 'error': str(error)}
+
+    return {
+        'file': filename,
+        'cards': stats.total,
+        'unique': len(stats.counts),
+        'lands': stats.lands,
+        'counts': stats.counts,
+        'colors': dict(zip(COLORS, stats.color_counts.tolist())),
+        'cmc': stats.cmc_counts.tolist(),
+        'curve': dict(zip(COLORS, stats.curve.tolist())),
+        'sideboard': sideboard,
+        'errors': errors,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='mtg-deck-editor analyze',
+        description='Print deck statistics as JSON, one line per file.')
+    parser.add_argument('files', metavar='DECKFILE', nargs='+')
+    parser.add_argument('-j', '--jobs', type=int, default=cpu_count(),
+                        help='number of decks analyzed in parallel')
+    args = parser.parse_args(argv)
+
+    jobs = max(1, min(args.jobs, len(args.files)))
+    pool = None
+    if jobs == 1:
+        results = map(analyze_deck, args.files)
+    else:
+        pool = Pool(jobs)
+        results = pool.imap(analyze_deck, args.files)
+    status = 0
+    try:
+        for result in results:
+            if 'error' in result:
+                status = 1
+            sys.stdout.write(json.dumps(result, sort_keys=True) + '\n')
+            sys.stdout.flush()
+    finally:
+        if pool is not None:
+            pool.close()
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
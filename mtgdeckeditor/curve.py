@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Mana curve computation, independent of GTK and matplotlib."""
+
+import numpy
+
+COLORS = ['c', 'w', 'u', 'b', 'r', 'g', 'm']
+COLOR_INDEX = dict((color, i) for i, color in enumerate(COLORS))
+# cmc buckets 0 to 16
+MAX_CMC = 17
+
+
+def card_buckets(card):
+    """The (color index, cmc) buckets a single copy of a card counts in.
+
+    A card counts once for every amount of mana it can be cast for, in
+    the bucket of its color, except that the highest hybrid mana cost and
+    the lowest phyrexian mana cost only need colorless mana. Lands are
+    not part of the curve.
+    """
+    if 'Land' in card.types:
+        return []
+    hybrid = False
+    phyrexian = False
+    for s in card.mana_cost:
+        if ' or ' in s:
+            hybrid = True
+        if s.startswith('Phyrexian'):
+            phyrexian = True
+    costs = [cmc for cmc in card.mana_costs
+             if isinstance(cmc, int) and 0 <= cmc < MAX_CMC]
+    color = COLOR_INDEX[card.color]
+    buckets = []
+    for cmc in costs:
+        # highest hybrid mana cost only needs colorless mana
+        if hybrid and cmc == max(card.mana_costs):
+            buckets.append((0, cmc))
+        # lowest phyrexian mana cost only needs colorless mana
+        elif phyrexian and cmc == min(card.mana_costs):
+            buckets.append((0, cmc))
+        else:
+            buckets.append((color, cmc))
+    return buckets
+
+
+def curve_matrix(deck):
+    """Count matrix of shape (len(COLORS), MAX_CMC) for a deck.
+
+    ``deck`` is an iterable of ``(amount, card)`` pairs, where ``card``
+    provides ``types``, ``mana_cost``, ``mana_costs`` and ``color``.
+    """
+    rows = []
+    columns = []
+    weights = []
+    for amount, card in deck:
+        for row, column in card_buckets(card):
+            rows.append(row)
+            columns.append(column)
+            weights.append(amount)
+    matrix = numpy.zeros((len(COLORS), MAX_CMC), dtype=numpy.int64)
+    numpy.add.at(matrix,
+                 (numpy.array(rows, dtype=numpy.intp),
+                  numpy.array(columns, dtype=numpy.intp)),
+                 numpy.array(weights, dtype=numpy.int64))
+    return matrix
+
+
+def curve_bottoms(matrix):
+    """Where each color's bars start when stacked in COLORS order."""
+    return numpy.cumsum(matrix, axis=0) - matrix
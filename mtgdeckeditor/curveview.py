@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""The mana curve window's plot, kept alive between openings."""
+
+from matplotlib.figure import Figure
+
+import numpy
+
+from mtgdeckeditor.curve import COLORS, MAX_CMC, curve_bottoms
+
+# bar colors and labels, in curve.COLORS order; this uses tango palette colors
+CURVE_STYLE = [
+    ('#c17d11', 'Colorless'), # “Chocolate”
+    ('#d3d7cf', 'White'), # “Aluminium”
+    ('#3465a4', 'Blue'), # “Sky blue”
+    ('#555753', 'Black'), # “Slate”
+    ('#cc0000', 'Red'), # “Scarlet Red”
+    ('#73d216', 'Green'), # “Chameleon”
+    ('#c4a000', 'Multicolor'), # “Butter Shadow”
+]
+
+
+class CurveView:
+    """A stacked bar chart of a curve matrix, see curve.curve_matrix.
+
+    The figure and one bar per color and cmc are created once; ``update``
+    only moves the bars of the columns that changed and lets the canvas
+    redraw when the main loop is idle, so bursts of updates cost a
+    single redraw.
+
+    The plot is drawn on a GTK3 Cairo canvas unless another matplotlib
+    ``canvas_class`` is given, such as the Agg canvas.
+    """
+
+    def __init__(self, canvas_class=None):
+        if canvas_class is None:
+            from matplotlib.backends.backend_gtk3cairo import \
+                FigureCanvasGTK3Cairo as canvas_class
+
+        self.figure = Figure(figsize=(5,5), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+
+        self.ax.set_title('Mana Curve')
+
+        self.ax.set_xlim([-0.5,16.5])
+        self.ax.set_xticks(range(MAX_CMC))
+        self.ax.set_ylim(0, 4)
+
+        x = numpy.arange(MAX_CMC) - 0.5
+        zeros = numpy.zeros(MAX_CMC)
+        self.bars = [self.ax.bar(x, zeros, width=1, color=fill, bottom=zeros,
+                                 label=label, align='edge')
+                     for fill, label in CURVE_STYLE]
+        self.matrix = numpy.zeros((len(COLORS), MAX_CMC), dtype=numpy.int64)
+        # colors shown in the legend
+        self.present = ()
+
+        self.canvas = canvas_class(self.figure)
+
+    def update(self, matrix):
+        changed = numpy.nonzero((matrix != self.matrix).any(axis=0))[0]
+        if len(changed) == 0:
+            return
+        bottoms = curve_bottoms(matrix)
+        for i, container in enumerate(self.bars):
+            for j in changed:
+                patch = container.patches[j]
+                patch.set_y(bottoms[i, j])
+                patch.set_height(matrix[i, j])
+        self.matrix = matrix.copy()
+
+        top = matrix.sum(axis=0).max() + 4
+        if top != self.ax.get_ylim()[1]:
+            self.ax.set_ylim(0, top)
+
+        present = tuple(i for i in range(len(COLORS)) if matrix[i].any())
+        if present != self.present:
+            self.present = present
+            if present:
+                self.ax.legend([self.bars[i] for i in present],
+                               [CURVE_STYLE[i][1] for i in present])
+            elif self.ax.get_legend() is not None:
+                self.ax.get_legend().remove()
+
+        self.canvas.draw_idle()
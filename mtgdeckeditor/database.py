@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Local card database, imported from an MTGJSON-style bulk dump.
+
+Usage: python -m mtgdeckeditor.database import AllCards.json
+"""
+
+from __future__ import with_statement
+
+import xdg.BaseDirectory
+
+import os
+import re
+import sys
+import json
+import pickle
+import sqlite3
+import threading
+
+from mtgdeckeditor.record import CardRecord, mana_costs, normalize
+
+MANA_SYMBOL = re.compile(r'\{([^}]*)\}')
+
+COLORS = {
+    'W': u'White',
+    'U': u'Blue',
+    'B': u'Black',
+    'R': u'Red',
+    'G': u'Green',
+}
+
+# Gatherer alt texts of the non-colored, non-numeric mana symbols
+SYMBOLS = {
+    'X': u'Variable Colorless',
+    'C': u'Colorless',
+    'S': u'Snow',
+}
+
+# layouts whose faces are all part of the castable card
+SPLIT_LAYOUTS = ('split', 'aftermath')
+
+
+def database_path():
+    return os.path.join(
+        xdg.BaseDirectory.save_data_path('mtg-deck-editor'), 'cards.db')
+
+
+def default_database():
+    """The local card database, or None if none was imported yet."""
+    path = database_path()
+    if os.path.exists(path):
+        return CardDatabase(path)
+    return None
+
+
+def _text(s):
+    if isinstance(s, bytes):
+        return s.decode('utf-8')
+    return s
+
+
+def symbol_alt(symbol):
+    """Translate an MTGJSON mana symbol into its Gatherer alt text."""
+    parts = symbol.split('/')
+    if len(parts) == 1:
+        return COLORS.get(symbol, SYMBOLS.get(symbol, symbol))
+    if parts[-1] == 'P':
+        return u'Phyrexian ' + u' or '.join(COLORS[p] for p in parts[:-1])
+    if parts[0] == '2':
+        return u'Two or ' + COLORS[parts[1]]
+    return u' or '.join(COLORS.get(p, p) for p in parts)
+
+
+def record_from_faces(name, faces):
+    """Build a CardRecord from the MTGJSON entries of one card's faces.
+
+    Split and aftermath cards keep their combined "A // B" name; other
+    multi-face cards (transform, adventure, modal double-faced) are
+    named by their front face, as Gatherer does.
+    """
+    faces = sorted(faces, key=lambda face: face.get('side', 'a'))
+    if faces[0].get('layout') not in SPLIT_LAYOUTS:
+        faces = faces[:1]
+        name = faces[0].get('faceName', name)
+    front = faces[0]
+
+    mana_cost = []
+    split_costs = []
+    for face in faces:
+        symbols = [symbol_alt(s)
+                   for s in MANA_SYMBOL.findall(face.get('manaCost', ''))]
+        mana_cost.extend(symbols)
+        if len(faces) > 1:
+            split_costs.append(symbols)
+
+    cmc = front.get('manaValue',
+                    front.get('convertedManaCost', front.get('cmc', 0)))
+    cmc = int(cmc)
+    types = u' // '.join(face.get('type', u'unknown') for face in faces)
+    costs = mana_costs(cmc, mana_cost, split_costs)
+    return CardRecord(name, name, mana_cost, costs, types, cmc)
+
+
+def iter_faces(data):
+    """Yield ``(name, faces)`` for every card in an MTGJSON file.
+
+    Understands atomic card files (name -> list of faces), the older
+    AllCards format (name -> card) and set or AllPrintings files (set ->
+    {'cards': [...]}). Faces of the same card are grouped by name.
+    """
+    if 'data' in data:
+        data = data['data']
+    if 'cards' in data:
+        data = {'': data}
+
+    cards = {}
+    for key, value in data.items():
+        if isinstance(value, list):
+            cards.setdefault(key, value)
+        elif 'cards' in value:
+            printed = {}
+            for card in value['cards']:
+                faces = printed.setdefault(card['name'], {})
+                faces.setdefault(card.get('faceName', card['name']), card)
+            for name, faces in printed.items():
+                cards.setdefault(name, list(faces.values()))
+        else:
+            names = value.get('names')
+            if value.get('layout') in SPLIT_LAYOUTS and names:
+                cards.setdefault(u' // '.join(names),
+                                 [data[n] for n in names if n in data])
+            cards.setdefault(key, [value])
+    return cards.items()
+
+
+class CardDatabase:
+    """Card records indexed by lower-cased name, for exact and prefix lookup."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def connection(self):
+        """Opened on first use; callers must hold the lock."""
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cards '
+                '(key TEXT PRIMARY KEY, name TEXT, record BLOB)')
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                'SELECT COUNT(*) FROM cards').fetchone()[0]
+
+    def import_json(self, path):
+        with open(path, 'rb') as dumpfile:
+            data = json.loads(dumpfile.read().decode('utf-8'))
+        rows = []
+        for name, faces in iter_faces(data):
+            if not faces:
+                continue
+            record = record_from_faces(name, faces)
+            rows.append((normalize(record.name), record.name,
+                         sqlite3.Binary(pickle.dumps(record, 2))))
+        with self.lock:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO cards VALUES (?, ?, ?)', rows)
+            self.connection.commit()
+        return len(rows)
+
+    def get_record(self, query):
+        key = normalize(_text(query))
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT record FROM cards WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(bytes(row[0]))
+
+    def complete(self, prefix, limit=20):
+        """Names starting with ``prefix``, answered from the primary key.
+
+        The prefix is normalized like the keys, so "Fire/" finds
+        "Fire // Ice" as get_record does.
+        """
+        key = normalize(_text(prefix))
+        if not key:
+            return []
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT name FROM cards WHERE key >= ? AND key < ? '
+                'ORDER BY key LIMIT ?',
+                (key, key + u'\uffff', limit)).fetchall()
+        return [row[0] for row in rows]
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] != 'import':
+        sys.stderr.write(__doc__.strip().splitlines()[-1] + '\n')
+        return 1
+    database = CardDatabase(database_path())
+    count = database.import_json(sys.argv[2])
+    sys.stdout.write('Imported %d cards into %s\n' % (count, database_path()))
+
+if __name__ == '__main__':
+    sys.exit(main())
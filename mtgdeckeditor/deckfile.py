@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Streaming deck file parsing.
+
+Plain text lists are read line by line, in the "amount name" format this
+editor saves and in the common variants of it: "4x Name", comments,
+"Sideboard" sections, "SB:" prefixes, MWS "[SET]" and Arena "(SET) 123"
+printings. MTGO .dek files are XML and are parsed incrementally as well.
+"""
+
+from __future__ import with_statement
+
+from collections import namedtuple
+from xml.etree.ElementTree import iterparse
+
+import io
+import re
+
+DeckEntry = namedtuple('DeckEntry', ['amount', 'name', 'sideboard'])
+
+LINE = re.compile(r'^(\d+)x?\s+(.+)$', re.IGNORECASE)
+SIDEBOARD_PREFIX = re.compile(r'^SB:\s*', re.IGNORECASE)
+MWS_SET = re.compile(r'^\[[^\]]*\]\s*')
+ARENA_SET = re.compile(r'\s+\([A-Za-z0-9_]+\)(\s+\S+)?$')
+
+# section headers, and whether their cards are in the sideboard
+SECTIONS = {
+    'deck': False,
+    'main': False,
+    'maindeck': False,
+    'main deck': False,
+    'commander': False,
+    'sideboard': True,
+    'companion': True,
+}
+
+
+def parse_lines(lines):
+    """Yield a DeckEntry for every card line of a plain text deck list."""
+    sideboard = False
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#') or line.startswith('//'):
+            continue
+        section = line.rstrip(':').lower()
+        if section in SECTIONS:
+            sideboard = SECTIONS[section]
+            continue
+
+        in_sideboard = sideboard
+        if SIDEBOARD_PREFIX.match(line):
+            line = SIDEBOARD_PREFIX.sub('', line)
+            in_sideboard = True
+        match = LINE.match(line)
+        if match is None:
+            continue
+        name = ARENA_SET.sub('', MWS_SET.sub('', match.group(2))).strip()
+        if name != '':
+            yield DeckEntry(int(match.group(1)), name, in_sideboard)
+
+
+def parse_dek_xml(deckfile):
+    """Yield a DeckEntry for every card of an MTGO .dek file."""
+    for event, element in iterparse(deckfile):
+        if element.tag == 'Cards':
+            try:
+                amount = int(element.get('Quantity', 1))
+            except ValueError:
+                amount = None
+            name = element.get('Name')
+            # skip malformed entries, as parse_lines does
+            if amount is not None and name:
+                yield DeckEntry(amount, name, element.get(
+                    'Sideboard', 'false').lower() == 'true')
+        element.clear()
+
+
+def iter_deck(filename):
+    """Yield the DeckEntry items of a deck file, reading it as it goes."""
+    with io.open(filename, 'rb') as deckfile:
+        head = deckfile.read(512)
+        deckfile.seek(0)
+        if head.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'<'):
+            for entry in parse_dek_xml(deckfile):
+                yield entry
+        else:
+            text = io.TextIOWrapper(deckfile, encoding='utf-8-sig',
+                                    errors='replace')
+            for entry in parse_lines(text):
+                yield entry
+
+
+def read_deck(filename):
+    return list(iter_deck(filename))
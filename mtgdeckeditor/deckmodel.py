@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""The deck list store, indexed by card name."""
+
+from __future__ import with_statement
+
+from contextlib import contextmanager
+
+from mtgdeckeditor.record import normalize
+
+
+class DeckModel:
+    """Keeps liststore_deck, its DeckStats and a name -> iter index in step.
+
+    List store iters stay valid until their row is removed, so looking up,
+    adding to and removing from a row by name takes constant time. Bulk
+    operations block the per-row signal handlers and update the statistics
+    directly. ``changed(names)`` is called after every modification with
+    the names whose counts changed. The deck view sorts through its own
+    TreeModelSort, so the store itself is never reordered and its row
+    paths stay those of the statistics.
+
+    The index is keyed by normalized name, so differently cased or spaced
+    spellings of a card end up in the row it already has.
+    """
+
+    def __init__(self, store, stats, changed, filter_model=None):
+        self.store = store
+        self.stats = stats
+        self.changed = changed
+        self.index = {}
+        self.filter_text = ''
+        self.filter_model = filter_model
+        if filter_model is not None:
+            filter_model.set_visible_func(self.visible)
+        self.handlers = [
+            store.connect('row-inserted', self.on_row_inserted),
+            store.connect('row-changed', self.on_row_changed),
+            store.connect('row-deleted', self.on_row_deleted),
+        ]
+
+    def __contains__(self, name):
+        return normalize(name) in self.index
+
+    def find(self, name):
+        return self.index.get(normalize(name))
+
+    def amount(self, name):
+        iterator = self.find(name)
+        if iterator is None:
+            return 0
+        return self.store[iterator][0]
+
+    @contextmanager
+    def blocked(self):
+        for handler in self.handlers:
+            self.store.handler_block(handler)
+        try:
+            yield
+        finally:
+            for handler in self.handlers:
+                self.store.handler_unblock(handler)
+
+    def add(self, name, amount):
+        iterator = self.find(name)
+        if iterator is None:
+            self.index[normalize(name)] = self.store.append([amount, name])
+        else:
+            self.store[iterator][0] += amount
+
+    def remove(self, name, amount):
+        """Take amount copies out of the deck, returning how many are left."""
+        iterator = self.find(name)
+        if iterator is None:
+            return 0
+        remaining = self.store[iterator][0] - amount
+        if remaining > 0:
+            self.store[iterator][0] = remaining
+            return remaining
+        del self.index[normalize(name)]
+        self.store.remove(iterator)
+        return 0
+
+    def extend(self, rows):
+        """Add many ``(amount, name)`` rows at once."""
+        names = []
+        with self.blocked():
+            for amount, name in rows:
+                iterator = self.find(name)
+                if iterator is None:
+                    iterator = self.store.append([amount, name])
+                    self.index[normalize(name)] = iterator
+                    self.stats.insert_row(len(self.stats.rows), amount, name)
+                else:
+                    name = self.store[iterator][1]
+                    amount += self.store[iterator][0]
+                    self.store[iterator][0] = amount
+                    self.stats.change_row(self.path_index(iterator),
+                                          amount, name)
+                names.append(name)
+        self.changed(names)
+
+    def clear(self):
+        with self.blocked():
+            self.store.clear()
+            self.stats.clear()
+            self.index.clear()
+        self.changed([])
+
+    def path_index(self, iterator):
+        return self.store.get_path(iterator).get_indices()[0]
+
+    def set_filter(self, text):
+        self.filter_text = text.lower()
+        if self.filter_model is not None:
+            self.filter_model.refilter()
+
+    def visible(self, model, iterator, data=None):
+        name = model[iterator][1]
+        return not self.filter_text or \
+            (name is not None and self.filter_text in name.lower())
+
+    def on_row_inserted(self, store, path, iterator):
+        amount, name = store[iterator][0], store[iterator][1]
+        self.stats.insert_row(path.get_indices()[0], amount, name)
+        self.changed([name])
+
+    def on_row_changed(self, store, path, iterator):
+        amount, name = store[iterator][0], store[iterator][1]
+        self.stats.change_row(path.get_indices()[0], amount, name)
+        self.changed([name])
+
+    def on_row_deleted(self, store, path):
+        self.stats.delete_row(path.get_indices()[0])
+        self.changed([])
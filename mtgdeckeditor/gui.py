@@ -0,0 +1,595 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#       
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+from __future__ import with_statement
+
+from gi.repository import GLib, Gtk, GObject
+
+import pkgutil
+import sys
+GObject.threads_init()
+
+from mtgdeckeditor import instrument, network
+from mtgdeckeditor.card import card_backend, card_cache, get_card, \
+    image_cache
+from mtgdeckeditor.deckfile import iter_deck
+from mtgdeckeditor.deckmodel import DeckModel
+from mtgdeckeditor.library import Library
+from mtgdeckeditor.loader import DeckLoader
+from mtgdeckeditor.prefetch import DECK, NEIGHBORS, SELECTION, \
+    SUGGESTIONS, TYPEAHEAD, Prefetcher
+from mtgdeckeditor.probability import by_turn
+from mtgdeckeditor.stats import DeckStats
+from mtgdeckeditor.typeahead import Typeahead
+
+
+class MtgDeckEditor:
+    def __init__(self, profile=None):
+        self.profile = profile
+
+        self.builder = Gtk.Builder()
+        self.builder.add_from_string(
+            pkgutil.get_data('mtgdeckeditor', 'Interface.GtkBuilder').decode('utf-8'))
+        self.builder.connect_signals(self)
+        if profile is not None:
+            profile.mark('builder')
+
+        self.window_main = self.builder.get_object("window_main")
+        self.window_curve = self.builder.get_object("window_curve")
+        self.window_hand = self.builder.get_object("window_hand")
+        self.window_aboutdialog = self.builder.get_object("window_aboutdialog")
+        self.window_simulation = self.builder.get_object("window_simulation")
+        self.window_debug = self.builder.get_object("window_debug")
+
+        self.filechooserdialog_open = \
+            self.builder.get_object("filechooserdialog_open")
+        self.filechooserdialog_save = \
+            self.builder.get_object("filechooserdialog_save")
+        self.recentmanager = Gtk.RecentManager.get_default()
+
+        self.progressbar = self.builder.get_object("progressbar")
+        self.treeview_deck = self.builder.get_object("treeview_deck")
+        self.builder.get_object("treeview_deck_column_probability") \
+            .set_cell_data_func(
+                self.builder.get_object("cellrenderertext_probability"),
+                self.probability_cell_data)
+
+        self.button_curve = self.builder.get_object("button_curve")
+        self.button_hand = self.builder.get_object("button_hand")
+
+        self.searchentry = self.builder.get_object("searchentry")
+
+        # The following code is a workaround for a GtkBuilder bug.
+        # See <https://bugzilla.redhat.com/show_bug.cgi?id=907946>
+        entrycompletion_search = self.builder.get_object("entrycompletion_search")
+        entrycompletion_search.set_text_column(0)
+
+        self.spinner_search = self.builder.get_object("spinner_search")
+        self.image_card = self.builder.get_object("image_card")
+        self.scrolledwindow_curve = self.builder.get_object('scrolledwindow_curve')
+        # created when the curve window is first opened
+        self.curve_view = None
+        self.label_simulation = self.builder.get_object("label_simulation")
+        self.spinner_simulation = self.builder.get_object("spinner_simulation")
+        self.label_debug = self.builder.get_object("label_debug")
+
+        self.button_card_add = self.builder.get_object("button_card_add")
+        self.button_card_remove = self.builder.get_object("button_card_remove")
+        self.spinbutton_card_amount = \
+            self.builder.get_object("spinbutton_card_amount")
+
+        self.liststore_deck = self.builder.get_object("liststore_deck")
+        self.liststore_search = self.builder.get_object("liststore_search")
+        self.adjustment_card_amount = \
+            self.builder.get_object("adjustment_card_amount")
+
+        self.deck_loader = DeckLoader(get_card)
+        self.load_job = None
+
+        self.deck_stats = DeckStats()
+        self.deck_model = DeckModel(
+            self.liststore_deck, self.deck_stats, self.update_deck_stats,
+            self.builder.get_object("treemodelfilter_deck"))
+        # deck names whose cards are being fetched for deck_stats
+        self.resolving = set()
+
+        # cancels the card display_card is loading
+        self.display_cancellable = None
+        # cancels the hand draw_hand is drawing
+        self.hand_cancellable = None
+
+        # names in liststore_search, which is only ever appended to
+        self.search_names = set()
+        self.typeahead = Typeahead(self.add_entrycompletion, card_backend)
+
+        self.prefetcher = Prefetcher(self.warm_card)
+
+    def main(self):
+        def first_frame(widget, context):
+            widget.disconnect(handler)
+            self.profile.mark('first frame')
+            self.profile.report()
+            GLib.idle_add(Gtk.main_quit)
+            return False
+
+        if self.profile is not None:
+            self.profile.mark('widgets')
+            handler = self.window_main.connect_after('draw', first_frame)
+        self.window_main.show_all()
+        if instrument.enabled:
+            self.window_debug.show()
+            self.refresh_debug()
+            GLib.timeout_add_seconds(DEBUG_INTERVAL, self.refresh_debug)
+        Gtk.main()
+
+    def clear(self):
+        if self.load_job is not None:
+            # a cancelled job posts nothing more, so undo add_cards here
+            self.load_job.cancel()
+            self.load_job = None
+            self.progressbar.hide()
+            self.treeview_deck.set_sensitive(True)
+        self.prefetcher.cancel(DECK)
+        self.prefetcher.cancel(SELECTION)
+        self.deck_model.clear()
+
+    def add_cards(self, entries):
+        def add_cards_callback(job, rows, done, total, finished):
+            if job is not self.load_job:
+                return False
+            self.deck_model.extend(rows)
+            if total is None:
+                # still reading the deck file
+                self.progressbar.pulse()
+            else:
+                self.progressbar.set_fraction(float(done)/max(total, 1))
+            if finished:
+                self.progressbar.hide()
+                self.treeview_deck.set_sensitive(True)
+                self.load_job = None
+                self.prefetcher.prefetch(
+                    DECK, [row[1] for row in self.liststore_deck])
+            return False
+
+        def post(*args):
+            instrument.idle_add(add_cards_callback, *args)
+
+        self.treeview_deck.set_sensitive(False)
+        self.progressbar.set_fraction(0)
+        self.progressbar.show()
+        self.load_job = self.deck_loader.load(entries, post)
+
+    @instrument.timed('add_entrycompletion')
+    def add_entrycompletion(self, names):
+        for name in names:
+            if name not in self.search_names:
+                self.search_names.add(name)
+                self.liststore_search.append([name])
+        self.prefetcher.prefetch(TYPEAHEAD, names[:SUGGESTIONS])
+
+    @instrument.timed('prefetch', gauge='prefetch')
+    def warm_card(self, group, query):
+        """Fetch a card and its image ahead of display_card.
+
+        Deck cards only have their image stored, so that a large deck does
+        not fill the image cache; display_card decodes it when the card is
+        selected.
+        """
+        card = get_card(query)
+        if group == DECK:
+            if not card.has_image():
+                card.image_raw()
+        else:
+            card.pixbuf
+
+    def display_card(self, query):
+        def display_card_callback(query, card, pixbuf):
+            self.searchentry.set_text(card.name)
+            self.image_card.set_from_pixbuf(pixbuf)
+            self.button_card_add.set_sensitive(True)
+            self.spinbutton_card_amount.set_sensitive(True)
+            if card_cache.canonical_name(query) in self.deck_model:
+                self.button_card_remove.set_sensitive(True)
+            self.searchentry.set_sensitive(True)
+            self.spinner_search.stop()
+            self.spinner_search.hide()
+            self.image_card.show()
+            return False
+
+        def display_card_done(query, future, cancellable):
+            if cancellable.cancelled:
+                return False
+            self.display_cancellable = None
+            try:
+                card, pixbuf = future.result()
+            except Exception as error:
+                sys.stderr.write('Could not load %s: %s\n' % (query, error))
+                self.searchentry.set_sensitive(True)
+                self.spinner_search.stop()
+                self.spinner_search.hide()
+                return False
+            return display_card_callback(query, card, pixbuf)
+
+        @instrument.timed('display_card', gauge='display_card')
+        def display_card_async(query):
+            card = get_card(query)
+            return card, card.pixbuf
+
+        # a newer search replaces the one still loading
+        if self.display_cancellable is not None:
+            self.display_cancellable.cancel()
+            self.display_cancellable = None
+
+        # prefetched cards are shown right away, without the spinner
+        card = card_cache.peek(query)
+        if card is not None:
+            pixbuf = image_cache.peek(card.query)
+            if pixbuf is not None:
+                display_card_callback(query, card, pixbuf)
+                return
+
+        cancellable = self.display_cancellable = network.Cancellable()
+        future = cancellable.track(network.submit(
+            display_card_async, query, priority=network.INTERACTIVE))
+        future.add_done_callback(lambda future: instrument.idle_add(
+            display_card_done, query, future, cancellable))
+
+        # the image of a prefetched deck card only needs decoding, which is
+        # too quick to be worth the spinner
+        if card is not None and card.has_image():
+            return
+
+        self.searchentry.set_sensitive(False)
+        self.button_card_add.set_sensitive(False)
+        self.button_card_remove.set_sensitive(False)
+        self.spinbutton_card_amount.set_sensitive(False)
+        self.spinner_search.start()
+        self.spinner_search.show()
+        self.image_card.hide()
+
+    def on_window_aboutdialog_response(self, widget, data=None):
+        self.window_aboutdialog.hide()
+
+    def on_window_main_destroy(self, widget, data=None):
+        Gtk.main_quit()
+
+    def probability_cell_data(self, column, cell, model, iterator, data=None):
+        # chance of having drawn at least one copy by PROBABILITY_TURN
+        copies = self.deck_stats.counts.get(model[iterator][1], 0)
+        p = by_turn(self.deck_stats.total, copies, PROBABILITY_TURN)
+        cell.set_property('text', '%.1f%%' % (100*p))
+
+    def update_deck_stats(self, names):
+        def resolve_callback(name, future):
+            self.resolving.discard(name)
+            if future.exception() is None:
+                self.deck_stats.resolve(name, future.result())
+                self.refresh_curve()
+            return False
+
+        def resolved(future, name):
+            instrument.idle_add(resolve_callback, name, future)
+
+        for name in names:
+            if name is None or name in self.deck_stats.cards or \
+                    name in self.resolving:
+                continue
+            card = card_cache.peek(name)
+            if card is not None:
+                self.deck_stats.resolve(name, card)
+            else:
+                self.resolving.add(name)
+                future = network.submit(get_card, name,
+                                        priority=network.LOAD)
+                future.add_done_callback(
+                    lambda future, name=name: resolved(future, name))
+
+        # the deck size changes every row's draw probability
+        self.treeview_deck.queue_draw()
+        self.refresh_curve()
+
+        total_cards = self.deck_stats.total
+        if total_cards == 0:
+            self.button_curve.set_sensitive(False)
+        else:
+            self.button_curve.set_sensitive(True)
+        if total_cards < 7:
+            self.button_hand.set_sensitive(False)
+        else:
+            self.button_hand.set_sensitive(True)
+
+    def on_searchentry_activate(self, widget, data=None):
+        query = widget.get_text()
+        self.display_card(query)
+
+    def on_searchentry_search_changed(self, widget, data=None):
+        query = widget.get_text()
+        self.typeahead.changed(query)
+
+    def on_button_new_clicked(self, widget, data=None):
+        self.clear()
+
+    def on_button_card_add_clicked(self, widget, data=None):
+        query = self.searchentry.get_text()
+        self.display_card(query)
+        self.deck_model.add(card_cache.canonical_name(query),
+                            int(self.adjustment_card_amount.get_value()))
+
+    def on_button_card_remove_clicked(self, widget, data=None):
+        query = self.searchentry.get_text()
+        remaining = self.deck_model.remove(
+            card_cache.canonical_name(query),
+            int(self.adjustment_card_amount.get_value()))
+        if remaining == 0:
+            self.button_card_remove.set_sensitive(False)
+
+    def on_searchentry_deck_search_changed(self, widget, data=None):
+        self.deck_model.set_filter(widget.get_text())
+
+    def on_button_curve_clicked(self, widget, data=None):
+        if self.curve_view is None:
+            # matplotlib is slow to import, so only load it for the curve window
+            from mtgdeckeditor.curveview import CurveView
+
+            self.curve_view = CurveView()
+            self.scrolledwindow_curve.add_with_viewport(self.curve_view.canvas)
+
+        # plot the cards resolved so far; the rest are looked up in the
+        # background and redraw the curve through refresh_curve
+        self.curve_view.update(self.deck_stats.curve)
+        self.window_curve.show_all()
+        self.update_deck_stats(self.deck_stats.unresolved())
+
+    def refresh_curve(self):
+        """Follow the deck while the curve window is open."""
+        if self.curve_view is not None and self.window_curve.get_visible():
+            self.curve_view.update(self.deck_stats.curve)
+
+    def on_button_info_clicked(self, widget, data=None):
+        self.window_aboutdialog.show()
+
+    def on_window_curve_delete_event(self, widget, data=None):
+        self.window_curve.hide()
+        return True
+
+    def on_button_open_clicked(self, widget, data=None):
+        self.filechooserdialog_open.show()
+
+    def on_button_open_cancel_clicked(self, widget, data=None):
+        self.filechooserdialog_open.hide()
+
+    def on_filechooserdialog_open_file_activated(self, widget, data=None):
+        self.on_button_open_file_clicked(widget)
+
+    def on_filechooserdialog_open_delete_event(self, widget, data=None):
+        self.filechooserdialog_open.hide()
+        return True
+
+    def on_button_open_file_clicked(self, widget, data=None):
+        self.filechooserdialog_open.hide()
+        filename = self.filechooserdialog_open.get_filename()
+        self.recentmanager.add_item(filename)
+        self.clear()
+        # the sideboard is not part of the deck list, so leave it out
+        entries = ((entry.amount, entry.name)
+                   for entry in iter_deck(filename) if not entry.sideboard)
+        self.add_cards(entries)
+
+    def on_button_save_clicked(self, widget, data=None):
+        self.filechooserdialog_save.show()
+
+    def on_button_save_cancel_clicked(self, widget, data=None):
+        self.filechooserdialog_save.hide()
+
+    def on_filechooserdialog_save_delete_event(self, widget, data=None):
+        self.filechooserdialog_save.hide()
+        return True
+
+    def on_button_save_file_clicked(self, widget, data=None):
+        self.filechooserdialog_save.hide()
+        filename = self.filechooserdialog_save.get_filename()
+        self.recentmanager.add_item(filename)
+        with open(filename, 'w') as deckfile:
+            for row in self.liststore_deck:
+                amount = row[0]
+                name = row[1]
+                deckfile.write('%s %s\n' % (amount, name))
+
+    def draw_hand(self, size):
+        @instrument.timed('draw_hand', gauge='draw_hand')
+        def draw_hand_async(library, size, cancellable):
+            def draw_hand_callback(pixbufs):
+                # a mulligan drew a newer hand in the meantime
+                if cancellable.cancelled:
+                    return False
+                self.hand_cancellable = None
+                for i in range(7):
+                    image_hand = self.builder.get_object("image_hand%s" % i)
+                    if i < len(pixbufs):
+                        image_hand.set_from_pixbuf(pixbufs[i])
+                        image_hand.show()
+                    else:
+                        image_hand.hide()
+                return False
+
+            # thumbnails are decoded at scale here, off the main loop
+            pixbufs = []
+            for i in range(size):
+                if cancellable.cancelled:
+                    return
+                pixbufs.append(library.draw().thumbnail())
+            instrument.idle_add(draw_hand_callback, pixbufs)
+
+        if self.hand_cancellable is not None:
+            self.hand_cancellable.cancel()
+        cancellable = self.hand_cancellable = network.Cancellable()
+        library = Library(self.liststore_deck)
+        library.shuffle()
+        cancellable.track(network.submit(draw_hand_async, library, size,
+                                         cancellable,
+                                         priority=network.INTERACTIVE)) \
+            .add_done_callback(report_error)
+
+    def on_button_hand_clicked(self, widget, data=None):
+        self.draw_hand(7)
+        self.window_hand.show_all()
+
+    def on_button_hand_close_clicked(self, widget, data=None):
+        for i in range(1,7):
+            button = self.builder.get_object("button_hand_mulligan_%s" % i)
+            button.hide()
+        self.window_hand.hide()
+
+    def on_button_hand_mulligan_6_clicked(self, widget, data=None):
+        widget.hide()
+        self.draw_hand(6)
+        self.builder.get_object("button_hand_mulligan_5").show()
+
+    def on_button_hand_mulligan_5_clicked(self, widget, data=None):
+        widget.hide()
+        self.draw_hand(5)
+        self.builder.get_object("button_hand_mulligan_4").show()
+
+    def on_button_hand_mulligan_4_clicked(self, widget, data=None):
+        widget.hide()
+        self.draw_hand(4)
+        self.builder.get_object("button_hand_mulligan_3").show()
+
+    def on_button_hand_mulligan_3_clicked(self, widget, data=None):
+        widget.hide()
+        self.draw_hand(3)
+        self.builder.get_object("button_hand_mulligan_2").show()
+
+    def on_button_hand_mulligan_2_clicked(self, widget, data=None):
+        widget.hide()
+        self.draw_hand(2)
+        self.builder.get_object("button_hand_mulligan_1").show()
+
+    def on_button_hand_mulligan_1_clicked(self, widget, data=None):
+        widget.hide()
+        self.draw_hand(1)
+
+    def on_entrycompletion_search_action_activated(self, widget, data=None):
+        self.searchentry.activate()
+
+    def on_entrycompletion_search_match_selected(self, widget, prefix, data=None):
+        # Without the following two lines, self.searchentry.get_text() returns
+        # the text before the completion was selected, even if the entry shows
+        # the text including the completion.
+        query = self.liststore_search[data][0]
+        self.searchentry.set_text(query)
+        self.searchentry.activate()
+
+    def on_treeview_selection_changed(self, widget, data=None):
+        tree, i = widget.get_selected()
+        if i is None:
+            return
+        # warm the rows around the selection, nearest first
+        selected = tree.get_path(i).get_indices()[0]
+        neighbors = []
+        for distance in range(1, NEIGHBORS + 1):
+            for index in (selected + distance, selected - distance):
+                if 0 <= index < tree.iter_n_children(None):
+                    neighbors.append(tree[index][1])
+        self.prefetcher.prefetch(SELECTION, neighbors)
+        self.searchentry.set_text(tree[i][1])
+        self.searchentry.activate()
+
+    def on_window_hand_delete_event(self, widget, data=None):
+        self.window_hand.hide()
+        return True
+
+    def on_button_hand_simulation_clicked(self, widget, data=None):
+        @instrument.timed('simulate', gauge='simulate')
+        def simulate_async(deck):
+            def simulate_callback(report):
+                self.label_simulation.set_text(report)
+                self.spinner_simulation.stop()
+                self.spinner_simulation.hide()
+                self.label_simulation.show()
+                return False
+
+            cards = [(amount, get_card(name)) for amount, name in deck]
+            deck_size = sum(amount for amount, card in cards)
+            lands = sum(amount for amount, card in cards
+                        if 'Land' in card.types)
+            lines = ['Land drops (exact, on the play / on the draw)']
+            for turn in range(1, 7):
+                lines.append('  turn %d: %5.1f%% / %5.1f%%' % (
+                    turn,
+                    100*by_turn(deck_size, lands, turn, turn, True),
+                    100*by_turn(deck_size, lands, turn, turn, False)))
+            lines.append('')
+            from mtgdeckeditor.simulation import Simulator
+            simulator = Simulator.from_deck(cards)
+            lines.append(simulator.report())
+            instrument.idle_add(simulate_callback, '\n'.join(lines))
+
+        deck = [(int(row[0]), row[1]) for row in self.liststore_deck]
+        self.label_simulation.hide()
+        self.spinner_simulation.start()
+        self.spinner_simulation.show()
+        self.window_simulation.show()
+        network.submit(simulate_async, deck, priority=network.INTERACTIVE) \
+            .add_done_callback(report_error)
+
+    def on_window_simulation_delete_event(self, widget, data=None):
+        self.window_simulation.hide()
+        return True
+
+    def refresh_debug(self):
+        if self.window_debug.get_visible():
+            self.label_debug.set_text(
+                instrument.format_snapshot(instrument.snapshot()))
+        return True
+
+    def on_window_debug_delete_event(self, widget, data=None):
+        self.window_debug.hide()
+        return True
+
+    def on_button_debug_reset_clicked(self, widget, data=None):
+        instrument.reset()
+        self.refresh_debug()
+
+    def on_button_debug_dump_clicked(self, widget, data=None):
+        dialog = Gtk.FileChooserDialog(
+            'Save Instrumentation', self.window_debug,
+            Gtk.FileChooserAction.SAVE,
+            (Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL,
+             Gtk.STOCK_SAVE, Gtk.ResponseType.OK))
+        dialog.set_do_overwrite_confirmation(True)
+        dialog.set_current_name('instrumentation.json')
+        if dialog.run() == Gtk.ResponseType.OK:
+            with open(dialog.get_filename(), 'w') as out:
+                instrument.dump(out)
+        dialog.destroy()
+
+
+def report_error(future):
+    """Done callback of background work nobody waits for."""
+    if not future.cancelled() and future.exception() is not None:
+        sys.stderr.write('Background task failed: %s\n' % future.exception())
+
+
+# seconds between refreshes of the instrumentation window
+DEBUG_INTERVAL = 1
+
+# turn shown in the deck list's draw probability column
+PROBABILITY_TURN = 3
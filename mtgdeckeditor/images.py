@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+from __future__ import with_statement
+
+from collections import OrderedDict
+
+import threading
+
+from mtgdeckeditor import instrument
+
+# memory budget of decoded pixbufs, in bytes; a full size card image
+# takes about 270 KiB, so this holds some hundred of them
+DEFAULT_PIXBUF_BUDGET = 32*1024*1024
+
+# (width, height) to scale images to, None for the original size
+FULL_SIZE = None
+# used for the hand window
+THUMBNAIL_SIZE = (160, 223)
+
+
+class ImageCache:
+    """Size-bounded LRU of decoded card images.
+
+    Compressed image bytes are kept in the card's DiskStore, so only
+    decoded pixbufs count against ``budget``. Each card can be cached at
+    several sizes; smaller sizes are decoded at scale straight from the
+    compressed bytes, never from a full size pixbuf. Decoding blocks, so
+    ``get`` should be called from a worker thread.
+    """
+
+    def __init__(self, budget=DEFAULT_PIXBUF_BUDGET):
+        self.budget = budget
+        self.size = 0
+        self.lock = threading.Lock()
+        self.pixbufs = OrderedDict()
+
+    def __len__(self):
+        with self.lock:
+            return len(self.pixbufs)
+
+    def peek(self, query, size=FULL_SIZE):
+        """The pixbuf for query if it is decoded already, without loading it."""
+        with self.lock:
+            return self.pixbufs.get((query, size))
+
+    def get(self, card, size=FULL_SIZE):
+        key = (card.query, size)
+        with self.lock:
+            pixbuf = self.pixbufs.pop(key, None)
+            if pixbuf is not None:
+                self.pixbufs[key] = pixbuf
+                return pixbuf
+
+        pixbuf = decode(card.image_raw(), size)
+
+        with self.lock:
+            if key not in self.pixbufs:
+                self.size += pixbuf_nbytes(pixbuf)
+            else:
+                # decoded concurrently by another thread
+                self.size -= pixbuf_nbytes(self.pixbufs.pop(key))
+                self.size += pixbuf_nbytes(pixbuf)
+            self.pixbufs[key] = pixbuf
+            # always keep the most recent pixbuf, even if it exceeds the budget
+            while self.size > self.budget and len(self.pixbufs) > 1:
+                _, evicted = self.pixbufs.popitem(last=False)
+                self.size -= pixbuf_nbytes(evicted)
+        return pixbuf
+
+    def clear(self):
+        with self.lock:
+            self.pixbufs.clear()
+            self.size = 0
+
+
+@instrument.timed('pixbuf.decode')
+def decode(image_raw, size=FULL_SIZE):
+    """Decode compressed image bytes, scaled to fit size if given."""
+    # imported here, so that cards can be resolved without GTK
+    from gi.repository import Gio
+    from gi.repository.GdkPixbuf import Pixbuf
+
+    if isinstance(image_raw, memoryview):
+        # from a card pack; only copied now that it is decoded
+        image_raw = image_raw.tobytes()
+    input_stream = Gio.MemoryInputStream.new_from_data(image_raw, None)
+    if size is None:
+        return Pixbuf.new_from_stream(input_stream, None)
+    width, height = size
+    return Pixbuf.new_from_stream_at_scale(
+        input_stream, width, height, True, None)
+
+
+def pixbuf_nbytes(pixbuf):
+    return pixbuf.get_rowstride()*pixbuf.get_height()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Runtime counters, timing histograms and worker gauges.
+
+Instrumentation is off unless the editor is started with --instrument.
+While it is off, every hook is a single flag check.
+"""
+
+from __future__ import with_statement
+
+from functools import wraps
+
+import json
+import time
+import threading
+
+enabled = False
+
+# upper bounds of the histogram buckets, in milliseconds
+BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_gauges = {}
+_sources = {}
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+class Histogram:
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # one more bucket for everything above the last bound
+        self.buckets = [0]*(len(BUCKETS) + 1)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        for i, bound in enumerate(BUCKETS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total/self.count if self.count else 0,
+            'max_ms': self.max,
+            'buckets': dict(zip([str(b) for b in BUCKETS] + ['inf'],
+                                self.buckets)),
+        }
+
+
+def count(name, n=1):
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def record(name, ms):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(ms)
+
+
+def timed(name, gauge=None):
+    """Decorator recording the duration of every call in histogram name,
+    and counting the calls in progress in gauge, if given."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            if gauge is not None:
+                _move(gauge, 1)
+            start = time.time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, 1000*(time.time() - start))
+                if gauge is not None:
+                    _move(gauge, -1)
+        return wrapper
+    return decorator
+
+
+def _move(gauge, delta):
+    with _lock:
+        _gauges[gauge] = _gauges.get(gauge, 0) + delta
+
+
+def idle_add(callback, *args):
+    """GLib.idle_add, recording how long callback waited for the main loop
+    and how long it ran."""
+    from gi.repository import GLib
+
+    if not enabled:
+        return GLib.idle_add(callback, *args)
+
+    def run(*args):
+        start = time.time()
+        record('idle.wait', 1000*(start - posted))
+        try:
+            return callback(*args)
+        finally:
+            record('idle.run.%s' % callback.__name__,
+                   1000*(time.time() - start))
+
+    posted = time.time()
+    return GLib.idle_add(run, *args)
+
+
+def register(name, source):
+    """Include ``source()``, a dict of numbers, in every snapshot."""
+    _sources[name] = source
+
+
+def snapshot():
+    with _lock:
+        result = {
+            'enabled': enabled,
+            'counters': dict(_counters),
+            'timings': dict((name, histogram.as_dict())
+                            for name, histogram in _histograms.items()),
+            'workers': dict(_gauges),
+        }
+    result['workers']['threads'] = threading.active_count()
+    for name, source in _sources.items():
+        result[name] = source()
+    return result
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        # gauges count work in progress, which a reset does not end
+
+
+def dump(out):
+    json.dump(snapshot(), out, indent=1, sort_keys=True)
+    out.write('\n')
+
+
+def format_snapshot(data):
+    """A plain text table of a snapshot, for the debug window."""
+    lines = []
+    for section in sorted(data):
+        values = data[section]
+        if not isinstance(values, dict):
+            continue
+        lines.append(section)
+        for name in sorted(values):
+            value = values[name]
+            if isinstance(value, dict) and 'count' in value:
+                lines.append('  %-32s %6d calls %9.1f ms mean %9.1f ms max' %
+                             (name, value['count'], value['mean_ms'],
+                              value['max_ms']))
+            else:
+                lines.append('  %-32s %s' % (name, value))
+        lines.append('')
+    return '\n'.join(lines)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+from random import shuffle
+
+from mtgdeckeditor.card import get_card
+
+
+class Library:
+    def __init__(self, liststore, get_card=get_card):
+        self.get_card = get_card
+        self.cards = []
+        for row in liststore:
+            amount = row[0]
+            name = row[1]
+            self.cards.extend(amount*[name])
+
+    def shuffle(self):
+        shuffle(self.cards)
+
+    def draw(self):
+        return self.get_card(self.cards.pop())
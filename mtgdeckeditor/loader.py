@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+from __future__ import with_statement
+
+import sys
+import time
+import threading
+
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
+
+from mtgdeckeditor import network
+
+# rows are handed to the UI in batches of this size ...
+DEFAULT_BATCH_SIZE = 64
+# ... or after this many seconds, whichever comes first
+DEFAULT_BATCH_INTERVAL = 0.1
+
+
+class DeckLoader:
+    """Resolves deck entries on the network executor.
+
+    ``resolve(query)`` is called at most once per distinct query and job,
+    so repeated lines in a deck file share a single fetch.
+    """
+
+    def __init__(self, resolve, batch_size=DEFAULT_BATCH_SIZE,
+                 batch_interval=DEFAULT_BATCH_INTERVAL):
+        self.resolve = resolve
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+
+    def load(self, entries, post):
+        """Start loading ``(amount, query)`` pairs in the background.
+
+        ``post(job, rows, done, total, finished)`` is called from the
+        loader thread with lists of ``(amount, name)`` rows; it is up to
+        the caller to hand them over to the main loop. ``total`` is None
+        while entries are still being read, as the fraction done would
+        jump backwards as it grows.
+        """
+        job = LoadJob(self, entries, post)
+        thread = threading.Thread(target=job.run)
+        thread.daemon = True
+        thread.start()
+        return job
+
+
+class LoadJob:
+    """A single load; ``entries`` may be a generator, which is consumed
+    on the loader thread while earlier entries are already resolving."""
+
+    def __init__(self, loader, entries, post):
+        self.loader = loader
+        self.entries = entries
+        self.post = post
+        self.cancelled = False
+        self.exhausted = False
+        self.futures = {}
+        self.results = Queue()
+        self.rows = []
+        self.last_post = time.time()
+        self.done = 0
+        self.total = 0
+
+    def cancel(self):
+        self.cancelled = True
+        for future in self.futures.values():
+            future.cancel()
+
+    def submit(self, amount, query):
+        future = self.futures.get(query)
+        if future is None:
+            future = network.submit(self.loader.resolve, query,
+                                    priority=network.LOAD)
+            self.futures[query] = future
+        future.add_done_callback(
+            lambda future, amount=amount, query=query:
+                self.results.put((amount, query, future)))
+        self.total += 1
+
+    def collect(self, timeout=None):
+        """Take finished lookups, waiting up to timeout for the first one,
+        and post the rows collected so far once a batch is due."""
+        try:
+            if timeout is None:
+                result = self.results.get_nowait()
+            else:
+                result = self.results.get(timeout=timeout)
+            while True:
+                amount, query, future = result
+                self.done += 1
+                if not future.cancelled():
+                    error = future.exception()
+                    if error is None:
+                        self.rows.append((amount, future.result().name))
+                    else:
+                        sys.stderr.write(
+                            'Could not load %s: %s\n' % (query, error))
+                result = self.results.get_nowait()
+        except Empty:
+            pass
+
+        finished = self.exhausted and self.done == self.total
+        if self.rows and not finished and not self.cancelled and \
+                (len(self.rows) >= self.loader.batch_size or
+                 time.time() - self.last_post >= self.loader.batch_interval):
+            total = self.total if self.exhausted else None
+            self.post(self, self.rows, self.done, total, False)
+            self.rows = []
+            self.last_post = time.time()
+
+    def run(self):
+        try:
+            for amount, query in self.entries:
+                if self.cancelled:
+                    return
+                self.submit(amount, query)
+                self.collect()
+        except (EnvironmentError, SyntaxError, ValueError) as error:
+            # unreadable or malformed deck file; keep what was read so far
+            sys.stderr.write('Could not read deck: %s\n' % error)
+        self.exhausted = True
+
+        while self.done < self.total and not self.cancelled:
+            self.collect(self.loader.batch_interval)
+        if not self.cancelled:
+            self.post(self, self.rows, self.done, self.total, True)
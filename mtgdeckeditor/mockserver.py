@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Local stand-in for Gatherer and the typeahead service.
+
+Usage: python -m mtgdeckeditor.mockserver record FIXTURES NAME...
+       python -m mtgdeckeditor.mockserver serve [-p PORT] [-l SECONDS] FIXTURES
+
+``record`` saves the details pages and images of the named cards into the
+FIXTURES directory. ``serve`` answers requests for them, waiting the given
+latency before every response, so that loading and caching can be
+measured without the network. Point the editor at it with
+
+    MTG_DECK_EDITOR_SERVER=http://localhost:8080 mtg-deck-editor
+
+and use a scratch XDG_CACHE_HOME, or the card store will answer first.
+"""
+
+from __future__ import with_statement
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, quote, urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlsplit
+    from urllib import quote
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+from mtgdeckeditor.record import normalize
+
+DEFAULT_PORT = 8080
+# names returned per typeahead request, as the real service does
+TYPEAHEAD_LIMIT = 20
+
+
+class Fixtures:
+    """Recorded pages and images, one pair of files per card, plus an
+    index of card names."""
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = os.path.join(path, 'index.json')
+        self.names = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as index:
+                self.names = json.load(index)
+
+    def filename(self, name, extension):
+        return os.path.join(
+            self.path, quote(normalize(name).encode('utf-8'), safe='') +
+            extension)
+
+    def read(self, name, extension):
+        try:
+            with open(self.filename(name, extension), 'rb') as fixture:
+                return fixture.read()
+        except EnvironmentError:
+            return None
+
+    def write(self, name, extension, data):
+        with open(self.filename(name, extension), 'wb') as fixture:
+            fixture.write(data)
+
+    def record(self, backend, name):
+        self.write(name, '.html', backend.fetch_details(name))
+        self.write(name, '.jpg', backend.fetch_image(name))
+        self.names[normalize(name)] = name
+        with open(self.index_path, 'w') as index:
+            json.dump(self.names, index, indent=1, sort_keys=True)
+
+    def complete(self, prefix, limit=TYPEAHEAD_LIMIT):
+        key = normalize(prefix)
+        return sorted(name for k, name in self.names.items()
+                      if k.startswith(key))[:limit]
+
+
+def query_name(query):
+    """The card name of a Gatherer query string."""
+    name = parse_qs(query).get('name', [u''])[0]
+    if isinstance(name, bytes):
+        name = name.decode('utf-8')
+    # split cards are requested as [A]+[//]+[B]
+    return re.sub(r'[\[\]]', '', name)
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        url = urlsplit(self.path)
+        fixtures = self.server.fixtures
+        if url.path == '/Pages/Card/Details.aspx':
+            self.reply(fixtures.read(query_name(url.query), '.html'),
+                       'text/html; charset=utf-8')
+        elif url.path == '/Handlers/Image.ashx':
+            self.reply(fixtures.read(query_name(url.query), '.jpg'),
+                       'image/jpeg')
+        elif url.path == '/typeahead':
+            prefix = parse_qs(url.query).get('q', [''])[0]
+            if isinstance(prefix, bytes):
+                prefix = prefix.decode('utf-8')
+            names = [{'name': name} for name in fixtures.complete(prefix)]
+            self.reply(json.dumps(names).encode('utf-8'), 'application/json')
+        else:
+            self.reply(None, None)
+
+    def reply(self, body, content_type):
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class FixtureServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixtures, latency=0, verbose=False):
+        HTTPServer.__init__(self, address, Handler)
+        self.fixtures = fixtures
+        self.latency = latency
+        self.verbose = verbose
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m mtgdeckeditor.mockserver')
+    commands = parser.add_subparsers(dest='command')
+    record = commands.add_parser('record', help='record card fixtures')
+    record.add_argument('fixtures', metavar='FIXTURES')
+    record.add_argument('names', metavar='NAME', nargs='+')
+    serve = commands.add_parser('serve', help='serve recorded fixtures')
+    serve.add_argument('fixtures', metavar='FIXTURES')
+    serve.add_argument('-p', '--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('-l', '--latency', type=float, default=0,
+                       help='seconds to wait before every response')
+    serve.add_argument('-v', '--verbose', action='store_true',
+                       help='log every request')
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        from mtgdeckeditor.backend import GathererBackend
+
+        if not os.path.isdir(args.fixtures):
+            os.makedirs(args.fixtures)
+        fixtures = Fixtures(args.fixtures)
+        backend = GathererBackend()
+        for name in args.names:
+            fixtures.record(backend, name)
+        return 0
+
+    if args.command == 'serve':
+        server = FixtureServer(('localhost', args.port),
+                               Fixtures(args.fixtures), args.latency,
+                               args.verbose)
+        sys.stderr.write('Serving %s on http://localhost:%d/\n' %
+                         (args.fixtures, args.port))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    parser.print_usage()
+    return 2
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""The one place network requests and background work go through.
+
+All requests share one session, which keeps at most POOL_SIZE
+connections per host open and makes further requests to that host wait
+for a free one. Requests time out, and failed connections and server
+errors are retried with exponential backoff. Background work, network
+or not, runs on one bounded executor, most urgent work first.
+"""
+
+from __future__ import with_statement
+
+from concurrent.futures import Future
+
+import heapq
+import itertools
+import threading
+
+# connections kept open per host, shared by all worker threads
+POOL_SIZE = 8
+# worker threads of the executor
+WORKERS = 2*POOL_SIZE
+# seconds to connect, and to wait for data
+DEFAULT_TIMEOUT = (5, 30)
+RETRIES = 3
+# seconds before the first retry; every further retry waits twice as long
+BACKOFF = 0.5
+
+# executor priorities, most urgent first
+INTERACTIVE = 0
+LOAD = 1
+PREFETCH = 2
+
+_session = None
+_session_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Cancellable:
+    """Cancels the requests of one user action, e.g. one search.
+
+    Requests check it before they are sent and once their response has
+    arrived; futures passed to ``track`` are cancelled if still queued.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self.futures = []
+
+    def track(self, future):
+        self.futures.append(future)
+        if self.cancelled:
+            future.cancel()
+        return future
+
+    def cancel(self):
+        self.cancelled = True
+        for future in self.futures:
+            future.cancel()
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled()
+
+
+def session():
+    """Return the process-wide HTTP session, creating it on first use.
+
+    requests is only imported here, so startup does not pay for it.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            # no HTTP cache: the card store already keeps every record and
+            # image, and typeahead answers are cached per prefix in memory
+            from requests import Session
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(total=RETRIES, backoff_factor=BACKOFF,
+                          status_forcelist=(500, 502, 503, 504))
+            _session = Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE,
+                                  pool_block=True, max_retries=retry)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+def get(url, cancellable=None, **kwargs):
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    if cancellable is not None:
+        cancellable.check()
+    response = session().get(url, **kwargs)
+    if cancellable is not None:
+        cancellable.check()
+    response.raise_for_status()
+    return response
+
+
+class Executor:
+    """A thread pool that runs the most urgent submitted work first.
+
+    Work of equal priority runs in the order it was submitted.
+    """
+
+    def __init__(self, workers=WORKERS):
+        self.lock = threading.Lock()
+        self.ready = threading.Condition(self.lock)
+        self.queue = []
+        self.counter = itertools.count()
+        for i in range(workers):
+            thread = threading.Thread(target=self.run)
+            thread.daemon = True
+            thread.start()
+
+    def submit(self, function, *args, **kwargs):
+        """Queue function(*args); ``priority`` defaults to LOAD."""
+        priority = kwargs.pop('priority', LOAD)
+        future = Future()
+        with self.lock:
+            heapq.heappush(self.queue, (priority, next(self.counter), future,
+                                        function, args, kwargs))
+            self.ready.notify()
+        return future
+
+    def run(self):
+        while True:
+            with self.lock:
+                while not self.queue:
+                    self.ready.wait()
+                priority, _, future, function, args, kwargs = \
+                    heapq.heappop(self.queue)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = function(*args, **kwargs)
+            except BaseException as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+def executor():
+    """Return the process-wide executor, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = Executor()
+        return _executor
+
+
+def submit(function, *args, **kwargs):
+    return executor().submit(function, *args, **kwargs)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Read-only card packs, for handing a warm card store to other installs.
+
+Usage: python -m mtgdeckeditor.pack export PACK
+       python -m mtgdeckeditor.pack import PACK
+
+``export`` writes every record and image of the local card store, and of
+the installed pack, if any, into PACK. ``import`` installs PACK, so that
+cards in it are never fetched again; cards fetched later are kept in the
+local card store, as before.
+
+A pack is a header, the records as JSON and image bytes back to back,
+and a JSON index of where each card's data is. Packs are passed around
+between installs, so they hold plain data only, never pickles. A pack
+is memory mapped, so looking a card up reads only its own bytes,
+straight from the page cache.
+"""
+
+from __future__ import with_statement
+
+import xdg.BaseDirectory
+
+import os
+import sys
+import json
+import mmap
+import shutil
+import struct
+
+from mtgdeckeditor.cache import DiskStore, cache_path
+from mtgdeckeditor.record import CardRecord
+
+MAGIC = b'MTGPACK1'
+# magic, then offset and length of the index
+HEADER = struct.Struct('<8sQQ')
+
+
+def pack_path():
+    return os.path.join(
+        xdg.BaseDirectory.save_data_path('mtg-deck-editor'), 'cards.pack')
+
+
+def default_store():
+    """The local card store, behind the installed pack if there is one."""
+    store = DiskStore(cache_path('card_store.sqlite'))
+    path = pack_path()
+    if os.path.exists(path):
+        try:
+            store = PackStore(CardPack(path), store)
+        except (EnvironmentError, ValueError, struct.error) as error:
+            sys.stderr.write('Ignoring card pack %s: %s\n' % (path, error))
+    return store
+
+
+def encode_record(record):
+    """The fields of a CardRecord as JSON bytes."""
+    if record is None:
+        return b'null'
+    return json.dumps([record.query, record.name, list(record.mana_cost),
+                       sorted(record.mana_costs), record.types,
+                       record.cmc]).encode('utf-8')
+
+
+def decode_record(data):
+    fields = json.loads(bytes(data).decode('utf-8'))
+    if fields is None:
+        return None
+    if not isinstance(fields, list) or len(fields) != 6:
+        raise ValueError('malformed card record')
+    return CardRecord(*fields)
+
+
+class CardPack:
+    """A memory mapped pack file; see write_pack."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as packfile:
+            self.map = mmap.mmap(packfile.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, offset, length = HEADER.unpack_from(self.map, 0)
+            if magic != MAGIC:
+                raise ValueError('%s is not a card pack' % path)
+            # key -> (record offset, record length, image offset, image length)
+            self.index = json.loads(
+                self.map[offset:offset + length].decode('utf-8'))
+            if not isinstance(self.index, dict):
+                raise ValueError('%s has no card index' % path)
+        except Exception:
+            self.map.close()
+            raise
+        self.view = memoryview(self.map)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def _slice(self, offset, length):
+        if length == 0:
+            return None
+        return self.view[offset:offset + length]
+
+    def get_raw_record(self, key):
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        return self._slice(entry[0], entry[1])
+
+    def get_image(self, key):
+        """The image bytes of key as a memoryview into the pack."""
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        return self._slice(entry[2], entry[3])
+
+    def items(self):
+        """(key, record JSON, image) of every card; either may be None."""
+        for key in sorted(self.index):
+            record = self.get_raw_record(key)
+            image = self.get_image(key)
+            yield (key, record and bytes(record), image and bytes(image))
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+
+
+class PackStore:
+    """A CardPack in front of a writable overlay store, usually a DiskStore.
+
+    Lookups try the pack first; everything new goes to the overlay.
+    """
+
+    def __init__(self, pack, overlay):
+        self.pack = pack
+        self.overlay = overlay
+
+    def get_record(self, query):
+        data = self.pack.get_raw_record(query)
+        if data is None:
+            return self.overlay.get_record(query)
+        return decode_record(data)
+
+    def put_record(self, query, record):
+        self.overlay.put_record(query, record)
+
+    def get_image(self, query):
+        image = self.pack.get_image(query)
+        if image is None:
+            return self.overlay.get_image(query)
+        return image
+
+    def has_image(self, query):
+        return self.pack.get_image(query) is not None or \
+            self.overlay.has_image(query)
+
+    def put_image(self, query, image_raw):
+        self.overlay.put_image(query, image_raw)
+
+    def records(self):
+        records = dict(self.overlay.records())
+        for key, record, image in self.pack.items():
+            if record is not None:
+                records[key] = decode_record(record)
+        return sorted(records.items())
+
+    def raw_images(self):
+        images = dict(self.overlay.raw_images())
+        for key, record, image in self.pack.items():
+            if image is not None:
+                images[key] = image
+        return sorted(images.items())
+
+
+def write_pack(path, records, images):
+    """Write a pack of ``records``, (key, CardRecord) pairs, and
+    ``images``, (key, image bytes) pairs.
+
+    The pack is written next to path and moved there once complete, so
+    a pack in use is never seen half written.
+    """
+    index = {}
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as packfile:
+        packfile.write(HEADER.pack(MAGIC, 0, 0))
+        for slot, pairs in ((0, records), (2, images)):
+            for key, data in pairs:
+                if slot == 0:
+                    data = encode_record(data)
+                entry = index.setdefault(key, [0, 0, 0, 0])
+                entry[slot] = packfile.tell()
+                entry[slot + 1] = len(data)
+                packfile.write(data)
+        offset = packfile.tell()
+        data = json.dumps(index, sort_keys=True).encode('utf-8')
+        packfile.write(data)
+        packfile.seek(0)
+        packfile.write(HEADER.pack(MAGIC, offset, len(data)))
+    os.rename(temporary, path)
+    return len(index)
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] not in ('export', 'import'):
+        sys.stderr.write('\n'.join(__doc__.strip().splitlines()[2:4]) + '\n')
+        return 1
+    path = sys.argv[2]
+    if sys.argv[1] == 'export':
+        store = default_store()
+        count = write_pack(path, store.records(), store.raw_images())
+        sys.stdout.write('Exported %d cards into %s\n' % (count, path))
+    else:
+        try:
+            pack = CardPack(path)
+        except (EnvironmentError, ValueError, struct.error) as error:
+            sys.stderr.write('Cannot install %s: %s\n' % (path, error))
+            return 1
+        count = len(pack)
+        pack.close()
+        shutil.copyfile(path, pack_path() + '.tmp')
+        os.rename(pack_path() + '.tmp', pack_path())
+        sys.stdout.write('Installed %d cards into %s\n' % (count, pack_path()))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+from __future__ import with_statement
+
+import heapq
+import itertools
+import sys
+import threading
+
+from mtgdeckeditor import network
+
+# prefetch groups, most urgent first
+SELECTION = 0
+TYPEAHEAD = 1
+DECK = 2
+
+# prefetches running on the network executor at once
+DEFAULT_WORKERS = 2
+# rows above and below the selected deck row to prefetch
+NEIGHBORS = 3
+# typeahead suggestions to prefetch
+SUGGESTIONS = 3
+
+
+class Prefetcher:
+    """Warms caches for cards the user is likely to look at next.
+
+    ``warm(group, query)`` runs on the network executor at its lowest priority,
+    at most ``workers`` queries at a time. Each call to ``prefetch``
+    replaces the queries still pending for its group; queries of more
+    urgent groups are warmed first. Warming a card that is already cached
+    should be cheap, as it is not tracked here.
+    """
+
+    def __init__(self, warm, workers=DEFAULT_WORKERS):
+        self.warm = warm
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.queue = []
+        self.counter = itertools.count()
+        self.generations = {}
+        # queries being warmed right now
+        self.active = set()
+
+    def prefetch(self, group, queries):
+        with self.lock:
+            generation = self.generations.get(group, 0) + 1
+            self.generations[group] = generation
+            for query in queries:
+                if query is None:
+                    continue
+                heapq.heappush(self.queue, (group, next(self.counter),
+                                            generation, query))
+        self.pump()
+
+    def cancel(self, group):
+        self.prefetch(group, ())
+
+    def pump(self):
+        """Hand queries to the executor while there are free workers."""
+        with self.lock:
+            while len(self.active) < self.workers and self.queue:
+                group, _, generation, query = heapq.heappop(self.queue)
+                # skip queries that were replaced in the meantime, and
+                # queries that are already being warmed
+                if generation != self.generations[group] or \
+                        query in self.active:
+                    continue
+                self.active.add(query)
+                network.submit(self.run, group, query,
+                               priority=network.PREFETCH)
+
+    def run(self, group, query):
+        try:
+            self.warm(group, query)
+        except Exception as error:
+            sys.stderr.write('Could not prefetch %s: %s\n' % (query, error))
+        with self.lock:
+            self.active.discard(query)
+        self.pump()
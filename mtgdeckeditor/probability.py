@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Exact draw probabilities from the hypergeometric distribution."""
+
+from __future__ import with_statement
+
+import threading
+
+HAND_SIZE = 7
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def _comb(n, k):
+    if k < 0 or k > n:
+        return 0
+    k = min(k, n - k)
+    result = 1
+    for i in range(1, k + 1):
+        result = result*(n - k + i)//i
+    return result
+
+
+def draws_by_turn(turn, on_play=True):
+    """Cards seen by the given turn; on the play, turn 1 has no draw."""
+    return HAND_SIZE + turn - (1 if on_play else 0)
+
+
+def at_least_table(deck_size, copies, draws):
+    """P(at least x copies among draws cards), for x = 0 .. copies.
+
+    Tables are computed once per (deck size, copies, draws) and shared.
+    """
+    key = (deck_size, copies, draws)
+    with _tables_lock:
+        table = _tables.get(key)
+    if table is not None:
+        return table
+
+    draws = max(0, min(draws, deck_size))
+    total = float(_comb(deck_size, draws))
+    exactly = [_comb(copies, k)*_comb(deck_size - copies, draws - k)/total
+               for k in range(copies + 1)]
+    table = []
+    remaining = 1.0
+    for p in exactly:
+        table.append(max(0.0, min(1.0, remaining)))
+        remaining -= p
+    table = tuple(table)
+
+    with _tables_lock:
+        _tables[key] = table
+    return table
+
+
+def at_least(deck_size, copies, draws, x=1):
+    """P(drawing at least x of copies cards in a deck of deck_size)."""
+    if x <= 0:
+        return 1.0
+    if x > copies or deck_size <= 0:
+        return 0.0
+    return at_least_table(deck_size, copies, draws)[x]
+
+
+def by_turn(deck_size, copies, turn, x=1, on_play=True):
+    """P(having drawn at least x of copies cards by the given turn)."""
+    return at_least(deck_size, copies, draws_by_turn(turn, on_play), x)
+
+
+def deck_probabilities(counts, turn, x=1, on_play=True):
+    """P(at least x copies by turn), for every name in a name -> count map."""
+    deck_size = sum(counts.values())
+    return dict((name, by_turn(deck_size, copies, turn, x, on_play))
+                for name, copies in counts.items())
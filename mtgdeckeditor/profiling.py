@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Startup timing, see the --profile-startup option."""
+
+import sys
+import time
+
+
+class StartupProfile:
+    """Wall clock time spent in each named startup phase."""
+
+    def __init__(self):
+        self.start = self.last = time.time()
+        self.phases = []
+
+    def mark(self, phase):
+        """End the current phase, naming it."""
+        now = time.time()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self, out=sys.stderr):
+        for phase, seconds in self.phases:
+            out.write('%-12s %8.1f ms\n' % (phase, 1000*seconds))
+        out.write('%-12s %8.1f ms\n' % ('total', 1000*(self.last - self.start)))
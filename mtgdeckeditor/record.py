@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+try:
+    from html.parser import HTMLParser
+except ImportError:
+    from HTMLParser import HTMLParser
+
+import re
+
+from mtgdeckeditor import instrument
+
+ROW_ID = 'ctl00_ctl00_ctl00_MainContent_SubContent_SubContent_%sRow'
+# extract_record feeds pages to its parser in chunks of this many characters
+CHUNK_SIZE = 4096
+
+SPLIT = re.compile(r'\s*/{1,2}\s*')
+
+# mana symbols repeat across every card, so share one string per symbol
+_symbols = {}
+
+
+class CardRecord(object):
+    """Card fields extracted from a Gatherer details page."""
+
+    __slots__ = ('query', 'split', 'name', 'mana_cost', 'mana_costs',
+                 'types', 'cmc', 'color')
+
+    def __init__(self, query, name, mana_cost, mana_costs, types, cmc):
+        self.query = query
+        self.split = '//' in query
+        self.name = name
+        self.mana_cost = tuple(_symbols.setdefault(s, s) for s in mana_cost)
+        self.mana_costs = frozenset(mana_costs)
+        self.types = types
+        self.cmc = cmc
+        self.color = mana_color(self.mana_cost)
+
+    def __getstate__(self):
+        return (self.query, self.name, self.mana_cost, self.mana_costs,
+                self.types, self.cmc)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __repr__(self):
+        return 'CardRecord(%r)' % self.name
+
+
+FIELDS = ('name', 'mana', 'type', 'cmc')
+ROW_IDS = dict((ROW_ID % key, key) for key in FIELDS)
+# elements without an end tag
+VOID = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                  'link', 'meta', 'param', 'source', 'track', 'wbr'])
+
+
+@instrument.timed('record.extract')
+def parse_record(dom, query):
+    """Extract a CardRecord from a parsed details page in a single pass."""
+    split = '//' in query
+    rows = dict((key, []) for key in FIELDS)
+    split_costs = []
+
+    for element in dom.iter():
+        key = ROW_IDS.get(element.get('id'))
+        if key is not None:
+            rows[key].extend(
+                (e.text or u'', [i.attrib['alt'] for i in e if i.tag == 'img'])
+                for e in element if e.tag == 'div')
+        elif split and element.tag == 'span' and \
+                element.get('class') == 'manaCost':
+            split_costs.append(
+                [e.attrib['alt'] for e in element if e.tag == 'img'])
+
+    return record_from_rows(query, rows, split_costs)
+
+
+class RecordParser(HTMLParser):
+    """Collects the same cells as parse_record while the page streams by,
+    without building a tree.
+
+    Only the open elements are tracked; end tags close everything up to
+    the matching start tag, which is all the repair Gatherer pages need.
+    """
+
+    def __init__(self, split=False):
+        HTMLParser.__init__(self)
+        self.split = split
+        self.rows = dict((key, []) for key in FIELDS)
+        self.split_costs = []
+        # (tag, cell) of every open element; cell is ('row', key) for a
+        # row, [text, image alts, still reading text] for a cell of a row
+        # or a split card's mana cost, and None for anything else
+        self.stack = []
+        self.found = False
+        # rows that were read up to their end tag
+        self.closed = set()
+
+    @property
+    def done(self):
+        """Whether the rest of the page can be skipped."""
+        return not self.split and len(self.closed) == len(FIELDS)
+
+    def handle_starttag(self, tag, attrs):
+        parent = self.stack[-1][1] if self.stack else None
+        if isinstance(parent, list):
+            # text after the first child is not part of element.text
+            parent[2] = False
+            if tag == 'img':
+                alt = dict(attrs).get('alt')
+                if alt is not None:
+                    parent[1].append(alt)
+        if tag in VOID:
+            return
+
+        cell = None
+        attrs = dict(attrs)
+        key = ROW_IDS.get(attrs.get('id'))
+        if key is not None:
+            self.found = True
+            cell = ('row', key)
+        elif tag == 'div' and isinstance(parent, tuple):
+            cell = [u'', [], True]
+            self.rows[parent[1]].append(cell)
+        elif self.split and tag == 'span' and \
+                attrs.get('class') == 'manaCost':
+            cell = [u'', [], False]
+            self.split_costs.append(cell[1])
+        self.stack.append((tag, cell))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                for open_tag, cell in self.stack[i:]:
+                    if isinstance(cell, tuple):
+                        self.closed.add(cell[1])
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        if self.stack:
+            cell = self.stack[-1][1]
+            if isinstance(cell, list) and cell[2]:
+                cell[0] += data
+
+    # only called without convert_charrefs, i.e. on Python 2
+    def handle_entityref(self, name):
+        self.handle_data(self.unescape('&%s;' % name))
+
+    def handle_charref(self, name):
+        self.handle_data(self.unescape('&#%s;' % name))
+
+
+@instrument.timed('record.fast_extract')
+def extract_record(html, query):
+    """Extract a CardRecord straight from the text of a details page.
+
+    Only the part of the page from the first card row on is parsed, and
+    only up to the end of the last row, unless a split card's mana costs
+    have to be found. Returns None if the page has none of the expected
+    rows, so that the caller can fall back to parse_record.
+    """
+    split = '//' in query
+    start = 0
+    if not split:
+        start = html.find(ROW_ID.split('%')[0])
+        if start < 0:
+            return None
+        start = html.rfind('<', 0, start)
+    parser = RecordParser(split)
+    for i in range(start, len(html), CHUNK_SIZE):
+        parser.feed(html[i:i + CHUNK_SIZE])
+        if parser.done:
+            break
+    else:
+        parser.close()
+    if not parser.found:
+        return None
+    rows = dict((key, [(cell[0], cell[1]) for cell in cells])
+                for key, cells in parser.rows.items())
+    return record_from_rows(query, rows, parser.split_costs)
+
+
+def record_from_rows(query, rows, split_costs):
+    """Build a CardRecord from the (text, image alts) pairs of the div
+    cells of each row; the second cell of a row holds its value."""
+    try:
+        name = rows['name'][1][0].strip() or query
+    except IndexError:
+        name = query
+
+    mana_cost = [alt for text, alts in rows['mana'] for alt in alts]
+
+    try:
+        types = rows['type'][1][0].strip() or u'unknown'
+    except IndexError:
+        types = u'unknown'
+
+    try:
+        cmc = int(rows['cmc'][1][0].strip())
+    except (IndexError, ValueError):
+        cmc = 0
+
+    costs = mana_costs(cmc, mana_cost, split_costs)
+    return CardRecord(query, name, mana_cost, costs, types, cmc)
+
+
+def mana_costs(cmc, mana_cost, split_costs=()):
+    """Every amount of mana a card can be cast for.
+
+    ``split_costs`` holds the mana symbols of each half of a split card.
+    """
+    costs = set()
+    for mana_symbols in split_costs:
+        cost = 0
+        for s in mana_symbols:
+            try:
+                cost += int(s)
+            except ValueError:
+                cost += 1
+        costs.add(cost)
+    costs.add(cmc)
+    for s in mana_cost:
+        if s.startswith('Phyrexian'):
+            costs.add(min(costs) - 1)
+        if ' or ' in s:
+            costs.add(min(costs) - 1)
+    return costs
+
+
+def mana_color(mana_cost):
+    # colors = ['c', 'w', 'u', 'b', 'r', 'g', 'm']
+    color = 'c' # colorless
+    for s in mana_cost:
+        if s in (u'White', u'Two or White', u'Phyrexian White'):
+            if color in ('c', 'w'):
+                color = 'w'
+            else:
+                color = 'm'
+        if s in (u'Blue', u'Two or Blue', u'Phyrexian Blue'):
+            if color in ('c', 'u'):
+                color = 'u'
+            else:
+                color = 'm'
+        if s in (u'Black', u'Two or Black', u'Phyrexian Black'):
+            if color in ('c', 'b'):
+                color = 'b'
+            else:
+                color = 'm'
+        if s in (u'Red', u'Two or Red', u'Phyrexian Red'):
+            if color in ('c', 'r'):
+                color = 'r'
+            else:
+                color = 'm'
+        if s in (u'Green', u'Two or Green', u'Phyrexian Green'):
+            if color in ('c', 'g'):
+                color = 'g'
+            else:
+                color = 'm'
+        # hybrid mana
+        if s in (
+            u'White or Blue',
+            u'White or Black',
+            u'Blue or Black',
+            u'Blue or Red',
+            u'Black or Red',
+            u'Black or Green',
+            u'Red or White',
+            u'Red or Green',
+            u'Green or Blue',
+            u'Green or White',
+            ):
+            color = 'm'
+    return color
+
+
+def clean_name(query):
+    """Collapse whitespace and spell split cards as "A // B"."""
+    return SPLIT.sub(u' // ', u' '.join(query.split()))
+
+
+def normalize(query):
+    """The key a card name is looked up by, ignoring case and spelling."""
+    return clean_name(query).lower()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Monte Carlo simulation of opening hands, mulligans and early turns.
+
+The deck is encoded as two NumPy arrays holding one entry per card copy,
+so every shuffle is a row of indices into them and many shuffles are
+sampled at once.
+"""
+
+import numpy
+
+HAND_SIZE = 7
+DEFAULT_SIMULATIONS = 100000
+# shuffles sampled per NumPy call, to bound memory use
+CHUNK_SIZE = 10000
+
+
+def default_keep(lands, size):
+    """Keep 2 to 5 lands in seven cards, and a hand that is not all lands
+    or all spells afterwards. A single card is always kept."""
+    if size == HAND_SIZE:
+        return (lands >= 2) & (lands <= 5)
+    if size == 1:
+        return numpy.ones_like(lands, dtype=bool)
+    return (lands >= 1) & (lands < size)
+
+
+class Simulator:
+    def __init__(self, lands, cmcs, seed=None):
+        self.lands = numpy.asarray(lands, dtype=bool)
+        self.cmcs = numpy.asarray(cmcs, dtype=numpy.int64)
+        self.random = numpy.random.RandomState(seed)
+
+    @classmethod
+    def from_deck(cls, deck, seed=None):
+        """Encode ``(amount, card)`` pairs, using the card types and cmc."""
+        lands = []
+        cmcs = []
+        for amount, card in deck:
+            cmc = card.cmc if isinstance(card.cmc, int) else 0
+            lands.extend(amount*['Land' in card.types])
+            cmcs.extend(amount*[cmc])
+        return cls(lands, cmcs, seed)
+
+    def __len__(self):
+        return len(self.lands)
+
+    def sample(self, simulations, draws):
+        """Indices of the top ``draws`` cards of independent shuffles."""
+        draws = min(draws, len(self))
+        chunks = []
+        for start in range(0, simulations, CHUNK_SIZE):
+            count = min(CHUNK_SIZE, simulations - start)
+            keys = self.random.random_sample((count, len(self)))
+            chunks.append(numpy.argsort(keys, axis=1)[:, :draws])
+        return numpy.concatenate(chunks)
+
+    def land_distribution(self, simulations=DEFAULT_SIMULATIONS,
+                          size=HAND_SIZE):
+        """P(k lands in the opening hand), for k = 0 .. size."""
+        lands = self.lands[self.sample(simulations, size)].sum(axis=1)
+        return numpy.bincount(lands, minlength=size + 1) / float(simulations)
+
+    def mulligan_rates(self, simulations=DEFAULT_SIMULATIONS,
+                       keep=default_keep):
+        """P(keeping a hand of each size), going down from seven to one.
+
+        Every mulligan is a fresh shuffle with one card less, as in the
+        hand window. ``keep(lands, size)`` decides on arrays of land counts.
+        """
+        rates = {}
+        remaining = simulations
+        for size in range(HAND_SIZE, 0, -1):
+            if remaining == 0:
+                rates[size] = 0.0
+                continue
+            lands = self.lands[self.sample(remaining, size)].sum(axis=1)
+            kept = int(numpy.count_nonzero(keep(lands, size)))
+            rates[size] = kept / float(simulations)
+            remaining -= kept
+        return rates
+
+    def on_curve(self, turns=6, simulations=DEFAULT_SIMULATIONS,
+                 on_play=True):
+        """P(a spell of cmc N can be cast on turn N), for N = 1 .. turns.
+
+        That needs N lands and a spell costing N among the cards seen by
+        turn N, without mulligans. On the play, no card is drawn on turn 1.
+        """
+        seen = HAND_SIZE + turns - (1 if on_play else 0)
+        drawn = self.sample(simulations, seen)
+        lands = self.lands[drawn]
+        cmcs = numpy.where(lands, -1, self.cmcs[drawn])
+        probabilities = numpy.zeros(turns)
+        for turn in range(1, turns + 1):
+            count = HAND_SIZE + turn - (1 if on_play else 0)
+            enough_lands = lands[:, :count].sum(axis=1) >= turn
+            spell = (cmcs[:, :count] == turn).any(axis=1)
+            probabilities[turn - 1] = \
+                numpy.count_nonzero(enough_lands & spell) / float(simulations)
+        return probabilities
+
+    def report(self, simulations=DEFAULT_SIMULATIONS, turns=6):
+        """A plain text summary of all statistics."""
+        lines = ['Opening hand lands (%d shuffles)' % simulations]
+        for k, p in enumerate(self.land_distribution(simulations)):
+            lines.append('  %d lands: %5.1f%%' % (k, 100*p))
+        lines.append('')
+        lines.append('Mulligans')
+        rates = self.mulligan_rates(simulations)
+        for size in range(HAND_SIZE, 0, -1):
+            lines.append('  keep %d: %5.1f%%' % (size, 100*rates[size]))
+        lines.append('')
+        lines.append('On curve (on the play / on the draw)')
+        play = self.on_curve(turns, simulations, True)
+        draw = self.on_curve(turns, simulations, False)
+        for turn in range(turns):
+            lines.append('  turn %d: %5.1f%% / %5.1f%%' %
+                         (turn + 1, 100*play[turn], 100*draw[turn]))
+        return '\n'.join(lines)
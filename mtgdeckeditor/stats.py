@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+"""Deck statistics, kept up to date from deck list row changes."""
+
+import numpy
+
+from mtgdeckeditor.curve import COLORS, COLOR_INDEX, MAX_CMC, card_buckets
+
+
+class DeckStats:
+    """Running totals of a deck list.
+
+    The row methods mirror the insert, change and delete signals of the
+    deck list store and only apply the difference each row makes. Totals
+    that need card data (color, cmc, lands and the mana curve) only cover
+    cards that were passed to ``resolve``; see ``unresolved``. Lands only
+    count towards ``lands``, not towards the color and cmc histograms.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self.total = 0
+        self.counts = {}
+        self.cards = {}
+        self.lands = 0
+        self.color_counts = numpy.zeros(len(COLORS), dtype=numpy.int64)
+        self.cmc_counts = numpy.zeros(MAX_CMC, dtype=numpy.int64)
+        self.curve = numpy.zeros((len(COLORS), MAX_CMC), dtype=numpy.int64)
+
+    def insert_row(self, index, amount, name):
+        self.rows.insert(index, (0, None))
+        self.change_row(index, amount, name)
+
+    def change_row(self, index, amount, name):
+        old_amount, old_name = self.rows[index]
+        self.rows[index] = (amount, name)
+        if name == old_name:
+            self._add(name, amount - old_amount)
+        else:
+            self._add(old_name, -old_amount)
+            self._add(name, amount)
+
+    def delete_row(self, index):
+        amount, name = self.rows.pop(index)
+        self._add(name, -amount)
+
+    def clear(self):
+        self.__init__()
+
+    def resolve(self, name, card):
+        if name in self.counts and name not in self.cards:
+            self.cards[name] = card
+            self._add_card(card, self.counts[name])
+
+    def unresolved(self):
+        return [name for name in self.counts if name not in self.cards]
+
+    def _add(self, name, amount):
+        if name is None or amount == 0:
+            return
+        self.total += amount
+        count = self.counts.get(name, 0) + amount
+        card = self.cards.get(name)
+        if card is not None:
+            self._add_card(card, amount)
+        if count:
+            self.counts[name] = count
+        else:
+            del self.counts[name]
+            self.cards.pop(name, None)
+
+    def _add_card(self, card, amount):
+        if 'Land' in card.types:
+            self.lands += amount
+            return
+        self.color_counts[COLOR_INDEX[card.color]] += amount
+        if isinstance(card.cmc, int) and 0 <= card.cmc < MAX_CMC:
+            self.cmc_counts[card.cmc] += amount
+        for row, column in card_buckets(card):
+            self.curve[row, column] += amount
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+from __future__ import with_statement
+
+from collections import OrderedDict
+
+import sys
+
+from mtgdeckeditor import instrument, network
+from mtgdeckeditor.backend import parse_typeahead
+
+# at most this many names are returned per query
+TYPEAHEAD_LIMIT = 20
+# milliseconds without a keystroke before a query is sent
+DEFAULT_DELAY = 150
+DEFAULT_CACHE_SIZE = 256
+
+
+def _text(s):
+    if isinstance(s, bytes):
+        return s.decode('utf-8')
+    return s
+
+
+class PrefixCache:
+    """LRU of prefix -> names.
+
+    A result with fewer than ``limit`` names is known to be complete, so
+    any longer prefix can be answered by filtering it locally.
+    """
+
+    def __init__(self, size=DEFAULT_CACHE_SIZE, limit=TYPEAHEAD_LIMIT):
+        self.size = size
+        self.limit = limit
+        self.results = OrderedDict()
+
+    def get(self, prefix):
+        key = _text(prefix).lower()
+        for end in range(len(key), 0, -1):
+            names = self.results.pop(key[:end], None)
+            if names is None:
+                continue
+            self.results[key[:end]] = names
+            if end == len(key):
+                return names
+            if len(names) < self.limit:
+                return [name for name in names
+                        if name.lower().startswith(key)]
+        return None
+
+    def put(self, prefix, names):
+        key = _text(prefix).lower()
+        self.results.pop(key, None)
+        self.results[key] = names
+        while len(self.results) > self.size:
+            self.results.popitem(last=False)
+
+
+class Typeahead:
+    """Debounced, cancelling search completion.
+
+    ``callback(names)`` is called on the main loop with the names for the
+    most recent query only; answers to outdated queries are dropped.
+    """
+
+    def __init__(self, callback, backend, delay=DEFAULT_DELAY):
+        self.callback = callback
+        self.backend = backend
+        self.delay = delay
+        self.cache = PrefixCache()
+        self.query = None
+        self.timeout = None
+        self.cancellable = None
+
+    def cancel(self):
+        from gi.repository import GLib
+
+        if self.timeout is not None:
+            GLib.source_remove(self.timeout)
+            self.timeout = None
+        if self.cancellable is not None:
+            self.cancellable.cancel()
+            self.cancellable = None
+
+    def changed(self, query):
+        # only the main loop parts need GLib, so PrefixCache works without
+        from gi.repository import GLib
+
+        self.cancel()
+        self.query = query
+        if not query:
+            return
+        names = self.cache.get(query)
+        if names is not None:
+            instrument.count('typeahead.cached')
+        else:
+            names = self.backend.complete(query, TYPEAHEAD_LIMIT)
+            if names is not None:
+                instrument.count('typeahead.local')
+                self.cache.put(query, names)
+        if names is not None:
+            self.callback(names)
+            return
+        if self.backend.typeahead_url(query) is None:
+            return
+        self.timeout = GLib.timeout_add(self.delay, self.fetch, query)
+
+    def fetch(self, query):
+        def done(future):
+            instrument.idle_add(self.fetched, future, query, cancellable)
+
+        self.timeout = None
+        # counted here, as debounced keystrokes never get this far
+        instrument.count('typeahead.fetched')
+        cancellable = self.cancellable = network.Cancellable()
+        future = cancellable.track(network.submit(
+            fetch_names, self.backend.typeahead_url(query), cancellable,
+            priority=network.INTERACTIVE))
+        future.add_done_callback(done)
+        return False
+
+    def fetched(self, future, query, cancellable):
+        if cancellable.cancelled:
+            # answers a query that was replaced by a newer one
+            return False
+        try:
+            names = future.result()
+        except Exception as error:
+            sys.stderr.write('Could not complete %s: %s\n' % (query, error))
+            return False
+        self.cache.put(query, names)
+        if query == self.query:
+            self.cancellable = None
+            self.callback(names)
+        return False
+
+
+def fetch_names(url, cancellable):
+    return parse_typeahead(network.get(url, cancellable).content)
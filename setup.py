@@ -25,9 +25,10 @@ setup(
     install_requires=[
         'pyxdg',
         'requests',
-        'requests-cache',
+        'futures; python_version < "3"',
         'html5lib',
         'matplotlib',
+        'numpy',
         'PyGObject',
         'setuptools',
         'pip'
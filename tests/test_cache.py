@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import threading
+import time
+import unittest
+
+from mtgdeckeditor.cache import CardCache
+from mtgdeckeditor.record import clean_name, normalize
+
+
+class FakeCard:
+    """Resolves every query to its title-cased name."""
+
+    def __init__(self, query, record=None, store=None, backend=None):
+        self.query = query
+        self.name = query.title()
+        self.measured = 0
+
+    @property
+    def nbytes(self):
+        self.measured += 1
+        return 100
+
+
+class CardCacheTest(unittest.TestCase):
+
+    def test_budget(self):
+        cache = CardCache(FakeCard, budget=250)
+        for name in (u'Opt', u'Duress', u'Negate'):
+            cache.get(name)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.size, 200)
+        self.assertNotIn(u'Opt', cache)
+        self.assertIn(u'Negate', cache)
+
+    def test_lru(self):
+        cache = CardCache(FakeCard, budget=250)
+        cache.get(u'Opt')
+        cache.get(u'Duress')
+        cache.get(u'Opt')
+        cache.get(u'Negate')
+        self.assertIn(u'Opt', cache)
+        self.assertNotIn(u'Duress', cache)
+
+    def test_measured_once(self):
+        cache = CardCache(FakeCard)
+        card = cache.get(u'Opt')
+        for i in range(3):
+            self.assertIs(cache.get(u'Opt'), card)
+        self.assertEqual(card.measured, 1)
+        self.assertEqual(cache.counters['hits'], 3)
+
+
+class SlowCard(FakeCard):
+    """Blocks until release is set, counting how often it was built."""
+
+    built = 0
+    release = threading.Event()
+
+    def __init__(self, query, **kwargs):
+        SlowCard.built += 1
+        self.release.wait(10)
+        if query == u'missing':
+            raise KeyError(query)
+        FakeCard.__init__(self, query, **kwargs)
+
+
+class CoalesceTest(unittest.TestCase):
+
+    def setUp(self):
+        SlowCard.built = 0
+        SlowCard.release.clear()
+        self.cache = CardCache(SlowCard)
+
+    def lookup(self, query, count):
+        results = []
+
+        def get():
+            try:
+                results.append(self.cache.get(query))
+            except KeyError as error:
+                results.append(error)
+
+        threads = [threading.Thread(target=get) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        # wait until all but the loading thread are waiting on its future
+        while self.cache.counters['coalesced'] < count - 1:
+            time.sleep(0.001)
+        SlowCard.release.set()
+        for thread in threads:
+            thread.join(10)
+        return results
+
+    def test_single_flight(self):
+        results = self.lookup(u'Opt', 8)
+        self.assertEqual(SlowCard.built, 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(card is results[0] for card in results))
+        self.assertEqual(self.cache.counters['loads'], 1)
+        self.assertEqual(self.cache.pending, {})
+
+    def test_shared_failure(self):
+        results = self.lookup(u'missing', 4)
+        self.assertEqual(SlowCard.built, 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(isinstance(error, KeyError) for error in results))
+        self.assertEqual(self.cache.pending, {})
+        # a failed load is not remembered, the next lookup tries again
+        self.assertRaises(KeyError, self.cache.get, u'missing')
+        self.assertEqual(SlowCard.built, 2)
+
+
+class AliasTest(unittest.TestCase):
+
+    def test_normalize(self):
+        self.assertEqual(clean_name(u'  Fire/Ice '), u'Fire // Ice')
+        self.assertEqual(clean_name(u'Fire  //  Ice'), u'Fire // Ice')
+        self.assertEqual(normalize(u'Lightning\tBOLT'), u'lightning bolt')
+
+    def test_spellings_share_a_card(self):
+        cache = CardCache(FakeCard)
+        card = cache.get(u'lightning bolt')
+        self.assertIs(cache.get(u'LIGHTNING  BOLT'), card)
+        self.assertIs(cache.peek(u'Lightning Bolt'), card)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.counters['loads'], 1)
+
+    def test_alias(self):
+        # a query that resolves to a differently spelled name
+        cache = CardCache(lambda query, **kwargs: FakeCard(u'opt', **kwargs))
+        card = cache.get(u'Opt (XLN)')
+        self.assertIs(cache.get(u'opt (xln)'), card)
+        self.assertIs(cache.get(u'Opt'), card)
+        self.assertEqual(cache.aliases, {u'opt (xln)': u'opt'})
+        self.assertEqual(cache.canonical_name(u'OPT (XLN)'), u'Opt')
+        self.assertEqual(cache.counters['loads'], 1)
+
+    def test_canonical_name_of_unknown_card(self):
+        cache = CardCache(FakeCard)
+        self.assertEqual(cache.canonical_name(u'fire/ice'), u'fire // ice')
+
+
+if __name__ == '__main__':
+    unittest.main()
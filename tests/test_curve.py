@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import unittest
+
+from mtgdeckeditor.curve import COLOR_INDEX, card_buckets, curve_matrix
+from mtgdeckeditor.record import CardRecord, mana_costs
+
+
+def card(mana_cost, cmc, types=u'Instant'):
+    return CardRecord(u'Test', u'Test', mana_cost, mana_costs(cmc, mana_cost),
+                      types, cmc)
+
+
+class CardBucketsTest(unittest.TestCase):
+
+    def test_plain(self):
+        self.assertEqual(card_buckets(card([u'1', u'Red'], 2)),
+                         [(COLOR_INDEX['r'], 2)])
+
+    def test_land(self):
+        self.assertEqual(card_buckets(card([], 0, u'Basic Land')), [])
+
+    def test_hybrid(self):
+        # the highest cost pays every hybrid symbol with colorless mana,
+        # each cheaper one pays one more symbol with red
+        buckets = card_buckets(card([u'Two or Red'] * 3, 6))
+        red = COLOR_INDEX['r']
+        self.assertEqual(sorted(buckets),
+                         [(0, 6), (red, 3), (red, 4), (red, 5)])
+
+    def test_phyrexian(self):
+        # the lowest cost pays the phyrexian symbol with life
+        buckets = card_buckets(card([u'1', u'Phyrexian Blue'], 2))
+        self.assertEqual(sorted(buckets), [(0, 1), (COLOR_INDEX['u'], 2)])
+
+    def test_matrix(self):
+        matrix = curve_matrix([(4, card([u'Red'], 1)),
+                               (2, card([u'1', u'Phyrexian Blue'], 2))])
+        self.assertEqual(matrix[COLOR_INDEX['r'], 1], 4)
+        self.assertEqual(matrix[0, 1], 2)
+        self.assertEqual(matrix[COLOR_INDEX['u'], 2], 2)
+        self.assertEqual(matrix.sum(), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import unittest
+
+import numpy
+
+try:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+except ImportError:
+    FigureCanvasAgg = None
+
+from mtgdeckeditor.curve import COLOR_INDEX, COLORS, MAX_CMC
+
+
+def matrix(*counts):
+    """A curve matrix from (color, cmc, amount) triples."""
+    result = numpy.zeros((len(COLORS), MAX_CMC), dtype=numpy.int64)
+    for color, cmc, amount in counts:
+        result[COLOR_INDEX[color], cmc] += amount
+    return result
+
+
+@unittest.skipIf(FigureCanvasAgg is None, 'matplotlib is not installed')
+class CurveViewTest(unittest.TestCase):
+
+    def setUp(self):
+        from mtgdeckeditor.curveview import CurveView
+
+        self.view = CurveView(FigureCanvasAgg)
+
+    def bar(self, color, cmc):
+        patch = self.view.bars[COLOR_INDEX[color]].patches[cmc]
+        return patch.get_y(), patch.get_height()
+
+    def test_update(self):
+        self.view.update(matrix(('r', 1, 4), ('u', 1, 2), ('u', 2, 3)))
+        self.assertEqual(self.bar('u', 1), (0, 2))
+        # red is stacked on blue, in COLORS order
+        self.assertEqual(self.bar('r', 1), (2, 4))
+        self.assertEqual(self.bar('u', 2), (0, 3))
+        self.assertEqual(self.view.ax.get_ylim()[1], 10)
+        self.assertEqual(
+            [text.get_text() for text in self.view.ax.get_legend().get_texts()],
+            ['Blue', 'Red'])
+        self.view.canvas.draw()
+
+    def test_update_in_place(self):
+        self.view.update(matrix(('r', 1, 4), ('u', 2, 3)))
+        patches = [bar.patches for bar in self.view.bars]
+        self.view.update(matrix(('r', 1, 4), ('g', 3, 1)))
+        self.assertEqual([bar.patches for bar in self.view.bars], patches)
+        self.assertEqual(self.bar('u', 2), (0, 0))
+        self.assertEqual(self.bar('g', 3), (0, 1))
+        self.assertEqual(self.bar('r', 1), (0, 4))
+        self.view.canvas.draw()
+
+    def test_empty(self):
+        self.view.update(matrix(('w', 0, 1)))
+        self.view.update(matrix())
+        self.assertIsNone(self.view.ax.get_legend())
+        self.assertEqual(self.view.ax.get_ylim()[1], 4)
+        self.view.canvas.draw()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mtgdeckeditor.database import CardDatabase, record_from_faces, \
+    symbol_alt
+
+FIRE_ICE = [
+    {'name': u'Fire // Ice', 'faceName': u'Fire', 'side': 'a',
+     'layout': 'split', 'manaCost': u'{1}{R}', 'manaValue': 4.0,
+     'type': u'Instant'},
+    {'name': u'Fire // Ice', 'faceName': u'Ice', 'side': 'b',
+     'layout': 'split', 'manaCost': u'{1}{U}', 'manaValue': 4.0,
+     'type': u'Instant'},
+]
+DELVER = [
+    {'name': u'Delver of Secrets // Insectile Aberration',
+     'faceName': u'Insectile Aberration', 'side': 'b',
+     'layout': 'transform', 'manaValue': 1.0,
+     'type': u'Creature — Human Insect'},
+    {'name': u'Delver of Secrets // Insectile Aberration',
+     'faceName': u'Delver of Secrets', 'side': 'a', 'layout': 'transform',
+     'manaCost': u'{U}', 'manaValue': 1.0,
+     'type': u'Creature — Human Wizard'},
+]
+
+
+class SymbolAltTest(unittest.TestCase):
+
+    def test_symbols(self):
+        self.assertEqual(symbol_alt('3'), u'3')
+        self.assertEqual(symbol_alt('R'), u'Red')
+        self.assertEqual(symbol_alt('X'), u'Variable Colorless')
+        self.assertEqual(symbol_alt('W/U'), u'White or Blue')
+        self.assertEqual(symbol_alt('2/G'), u'Two or Green')
+        self.assertEqual(symbol_alt('B/P'), u'Phyrexian Black')
+        self.assertEqual(symbol_alt('G/U/P'), u'Phyrexian Green or Blue')
+
+
+class RecordFromFacesTest(unittest.TestCase):
+
+    def test_single(self):
+        record = record_from_faces(u'Lightning Bolt', [
+            {'name': u'Lightning Bolt', 'layout': 'normal',
+             'manaCost': u'{R}', 'manaValue': 1.0, 'type': u'Instant'}])
+        self.assertEqual(record.name, u'Lightning Bolt')
+        self.assertEqual(record.mana_cost, (u'Red',))
+        self.assertEqual(record.cmc, 1)
+        self.assertEqual(record.color, 'r')
+
+    def test_split(self):
+        record = record_from_faces(u'Fire // Ice', FIRE_ICE)
+        self.assertEqual(record.name, u'Fire // Ice')
+        self.assertTrue(record.split)
+        self.assertEqual(record.mana_cost, (u'1', u'Red', u'1', u'Blue'))
+        self.assertEqual(record.types, u'Instant // Instant')
+        self.assertEqual(record.mana_costs, frozenset([2, 4]))
+
+    def test_transform(self):
+        # named and costed by the front face only
+        record = record_from_faces(DELVER[0]['name'], DELVER)
+        self.assertEqual(record.name, u'Delver of Secrets')
+        self.assertFalse(record.split)
+        self.assertEqual(record.mana_cost, (u'Blue',))
+        self.assertEqual(record.types, u'Creature — Human Wizard')
+
+
+class CardDatabaseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, 'cards.json')
+        with open(path, 'w') as dumpfile:
+            json.dump({'data': {u'Fire // Ice': FIRE_ICE,
+                                DELVER[0]['name']: DELVER}}, dumpfile)
+        self.database = CardDatabase(os.path.join(self.directory, 'cards.db'))
+        self.assertEqual(self.database.import_json(path), 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_record(self):
+        self.assertEqual(self.database.get_record(u'fire/ice').name,
+                         u'Fire // Ice')
+        self.assertEqual(self.database.get_record(u'Delver of Secrets').name,
+                         u'Delver of Secrets')
+        self.assertIsNone(self.database.get_record(u'Insectile Aberration'))
+
+    def test_complete(self):
+        self.assertEqual(self.database.complete(u'Fire/'), [u'Fire // Ice'])
+        self.assertEqual(self.database.complete(u'DELVER'),
+                         [u'Delver of Secrets'])
+        self.assertEqual(self.database.complete(u''), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import io
+import unittest
+
+from mtgdeckeditor.deckfile import DeckEntry, parse_dek_xml, parse_lines
+
+
+class ParseLinesTest(unittest.TestCase):
+
+    def test_plain(self):
+        lines = [u'# a comment', u'', u'4 Lightning Bolt', u'2x Counterspell',
+                 u'// another comment', u'1 [M10] Birds of Paradise']
+        self.assertEqual(list(parse_lines(lines)), [
+            DeckEntry(4, u'Lightning Bolt', False),
+            DeckEntry(2, u'Counterspell', False),
+            DeckEntry(1, u'Birds of Paradise', False),
+        ])
+
+    def test_sideboard_prefix(self):
+        lines = [u'4 Lightning Bolt', u'SB: 2 Pyroblast', u'sb:1 Negate']
+        self.assertEqual(list(parse_lines(lines)), [
+            DeckEntry(4, u'Lightning Bolt', False),
+            DeckEntry(2, u'Pyroblast', True),
+            DeckEntry(1, u'Negate', True),
+        ])
+
+    def test_arena(self):
+        lines = [u'Deck', u'4 Lightning Bolt (M10) 146',
+                 u'2 Fire // Ice (MH2) 290', u'1 Island (ELD)',
+                 u'', u'Sideboard', u'3 Duress (M19) 94']
+        self.assertEqual(list(parse_lines(lines)), [
+            DeckEntry(4, u'Lightning Bolt', False),
+            DeckEntry(2, u'Fire // Ice', False),
+            DeckEntry(1, u'Island', False),
+            DeckEntry(3, u'Duress', True),
+        ])
+
+    def test_sections(self):
+        lines = [u'Sideboard:', u'1 Negate', u'Main deck:', u'4 Opt',
+                 u'Companion', u'1 Lurrus of the Dream-Den']
+        self.assertEqual([entry.sideboard for entry in parse_lines(lines)],
+                         [True, False, True])
+
+    def test_garbage(self):
+        self.assertEqual(list(parse_lines([u'Lightning Bolt', u'x 4'])), [])
+
+
+class ParseDekXmlTest(unittest.TestCase):
+
+    def parse(self, xml):
+        return list(parse_dek_xml(io.BytesIO(xml)))
+
+    def test_dek(self):
+        self.assertEqual(self.parse(
+            b'<?xml version="1.0"?><Deck><NetDeckID>0</NetDeckID>'
+            b'<Cards CatID="1" Quantity="4" Sideboard="false"'
+            b' Name="Lightning Bolt" />'
+            b'<Cards CatID="2" Quantity="2" Sideboard="true"'
+            b' Name="Pyroblast" /></Deck>'), [
+                DeckEntry(4, u'Lightning Bolt', False),
+                DeckEntry(2, u'Pyroblast', True),
+            ])
+
+    def test_malformed_entries(self):
+        self.assertEqual(self.parse(
+            b'<Deck><Cards Quantity="many" Name="Lightning Bolt" />'
+            b'<Cards Quantity="1" /><Cards Name="Opt" /></Deck>'),
+            [DeckEntry(1, u'Opt', False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import threading
+import unittest
+
+from mtgdeckeditor.loader import DeckLoader
+
+
+class Named:
+    def __init__(self, name):
+        self.name = name
+
+
+class DeckLoaderTest(unittest.TestCase):
+
+    def load(self, entries):
+        posts = []
+        finished = threading.Event()
+
+        def post(job, rows, done, total, last):
+            posts.append((list(rows), done, total, last))
+            if last:
+                finished.set()
+
+        DeckLoader(lambda query: Named(query.title()),
+                   batch_size=1).load(entries, post)
+        self.assertTrue(finished.wait(10))
+        return posts
+
+    def test_rows(self):
+        posts = self.load([(4, u'lightning bolt'), (2, u'opt')])
+        rows = [row for post in posts for row in post[0]]
+        self.assertEqual(sorted(rows), [(2, u'Opt'), (4, u'Lightning Bolt')])
+        self.assertEqual(posts[-1][1:], (2, 2, True))
+
+    def test_total_unknown_while_reading(self):
+        for rows, done, total, last in self.load(
+                (1, u'card %d' % i) for i in range(50)):
+            if not last:
+                self.assertIsNone(total)
+
+    def test_malformed_deck(self):
+        def entries():
+            yield (4, u'lightning bolt')
+            raise ValueError('bad quantity')
+
+        posts = self.load(entries())
+        rows = [row for post in posts for row in post[0]]
+        self.assertEqual(rows, [(4, u'Lightning Bolt')])
+
+
+if __name__ == '__main__':
+    unittest.main()
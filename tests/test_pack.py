@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from mtgdeckeditor.cache import DiskStore
+from mtgdeckeditor.pack import MAGIC, CardPack, PackStore, write_pack
+from mtgdeckeditor.record import CardRecord
+
+BOLT = CardRecord(u'Lightning Bolt', u'Lightning Bolt', [u'Red'], [1],
+                  u'Instant', 1)
+FIRE_ICE = CardRecord(u'Fire // Ice', u'Fire // Ice',
+                      [u'1', u'Red', u'1', u'Blue'], [2, 4],
+                      u'Instant // Instant', 4)
+
+
+def fields(record):
+    return (record.query, record.name, record.mana_cost, record.mana_costs,
+            record.types, record.cmc, record.color, record.split)
+
+
+class PackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = DiskStore(os.path.join(self.directory, 'store.sqlite'))
+        self.store.put_record(u'lightning bolt', BOLT)
+        self.store.put_image(u'lightning bolt', b'bolt image')
+        self.store.put_record(u'fire // ice', FIRE_ICE)
+        self.path = os.path.join(self.directory, 'cards.pack')
+        self.pack = None
+
+    def tearDown(self):
+        if self.pack is not None:
+            self.pack.close()
+        shutil.rmtree(self.directory)
+
+    def export(self):
+        count = write_pack(self.path, self.store.records(),
+                           self.store.raw_images())
+        self.assertEqual(count, 2)
+        self.pack = CardPack(self.path)
+        return self.pack
+
+    def test_round_trip(self):
+        overlay = DiskStore(os.path.join(self.directory, 'overlay.sqlite'))
+        store = PackStore(self.export(), overlay)
+        self.assertEqual(fields(store.get_record(u'lightning bolt')),
+                         fields(BOLT))
+        self.assertEqual(fields(store.get_record(u'fire // ice')),
+                         fields(FIRE_ICE))
+        self.assertEqual(bytes(store.get_image(u'lightning bolt')),
+                         b'bolt image')
+        self.assertTrue(store.has_image(u'lightning bolt'))
+        self.assertFalse(store.has_image(u'fire // ice'))
+        self.assertIsNone(store.get_record(u'opt'))
+
+    def test_overlay(self):
+        overlay = DiskStore(os.path.join(self.directory, 'overlay.sqlite'))
+        store = PackStore(self.export(), overlay)
+        opt = CardRecord(u'Opt', u'Opt', [u'Blue'], [1], u'Instant', 1)
+        store.put_record(u'opt', opt)
+        self.assertEqual(fields(overlay.get_record(u'opt')), fields(opt))
+        self.assertEqual([key for key, record in store.records()],
+                         [u'fire // ice', u'lightning bolt', u'opt'])
+
+    def test_plain_data(self):
+        self.export()
+        with open(self.path, 'rb') as packfile:
+            data = packfile.read()
+        self.assertTrue(data.startswith(MAGIC))
+        self.assertIn(b'["Lightning Bolt", "Lightning Bolt", ["Red"]', data)
+
+    def test_not_a_pack(self):
+        with open(self.path, 'wb') as packfile:
+            packfile.write(b'garbage')
+        self.assertRaises((ValueError, struct.error), CardPack, self.path)
+        with open(self.path, 'wb') as packfile:
+            packfile.write(b'NOTAPACK' + b'\0' * 16)
+        self.assertRaises(ValueError, CardPack, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import unittest
+from math import factorial
+
+from mtgdeckeditor.probability import at_least, at_least_table, by_turn, \
+    deck_probabilities, draws_by_turn
+
+
+def comb(n, k):
+    return factorial(n)//(factorial(k)*factorial(n - k))
+
+
+def exactly(deck_size, copies, draws, k):
+    return float(comb(copies, k)*comb(deck_size - copies, draws - k)) / \
+        comb(deck_size, draws)
+
+
+class AtLeastTest(unittest.TestCase):
+
+    def test_one_copy(self):
+        # 1 - P(none of the 4 copies among 7 cards)
+        self.assertAlmostEqual(at_least(60, 4, 7),
+                               1 - exactly(60, 4, 7, 0), 12)
+        self.assertAlmostEqual(at_least(60, 4, 7), 0.3995, 4)
+
+    def test_several_copies(self):
+        for x in range(1, 5):
+            expected = sum(exactly(40, 4, 10, k) for k in range(x, 5))
+            self.assertAlmostEqual(at_least(40, 4, 10, x), expected, 12)
+
+    def test_bounds(self):
+        self.assertEqual(at_least(60, 4, 7, 0), 1.0)
+        self.assertEqual(at_least(60, 4, 7, 5), 0.0)
+        self.assertEqual(at_least(0, 0, 7), 0.0)
+        self.assertEqual(at_least(60, 60, 7), 1.0)
+        # drawing the whole deck finds every copy
+        self.assertAlmostEqual(at_least(10, 3, 20, 3), 1.0, 12)
+
+    def test_table_is_shared(self):
+        self.assertIs(at_least_table(60, 4, 7), at_least_table(60, 4, 7))
+        table = at_least_table(60, 4, 7)
+        self.assertEqual(len(table), 5)
+        self.assertEqual(list(table), sorted(table, reverse=True))
+
+    def test_turns(self):
+        self.assertEqual(draws_by_turn(1), 7)
+        self.assertEqual(draws_by_turn(1, on_play=False), 8)
+        self.assertEqual(by_turn(60, 4, 3), at_least(60, 4, 9))
+        self.assertEqual(deck_probabilities({u'Opt': 4, u'Island': 56}, 1),
+                         {u'Opt': at_least(60, 4, 7),
+                          u'Island': at_least(60, 56, 7)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import unittest
+
+from mtgdeckeditor.backend import parse_html
+from mtgdeckeditor.record import ROW_ID, extract_record, parse_record
+
+ROW = (u'<div id="' + ROW_ID + u'"><div class="label">%s:</div>'
+       u'<div class="value">%s</div></div>')
+
+
+def images(mana_cost):
+    return u''.join(u'<img alt="%s" src="x.gif">' % s for s in mana_cost)
+
+
+def details_page(name, types, mana_cost, cmc, before=u'', after=u''):
+    """A details page shaped like Gatherer's, with navigation around the
+    card rows so that they are not at the start of the page."""
+    return (u'<!DOCTYPE html><html><head><title>%s</title></head><body>'
+            u'<ul class="nav"><li><a href="/"><img src="x.gif" alt="">Home'
+            u'</a></li></ul><div class="cardDetails">%s%s%s%s%s%s</div>'
+            u'</body></html>' % (
+                name, before, ROW % ('name', u'Card Name', name),
+                ROW % ('mana', u'Mana Cost', images(mana_cost)),
+                ROW % ('type', u'Types', types),
+                ROW % ('cmc', u'Converted Mana Cost', cmc), after))
+
+SPLIT_PAGE = details_page(
+    u'Fire // Ice', u'Instant', [u'1', u'Red'], 2,
+    before=u'<span class="manaCost">%s</span>' % images([u'1', u'Red']),
+    after=u'<span class="manaCost">%s</span>' % images([u'1', u'Blue']))
+
+
+def fields(record):
+    return (record.query, record.name, record.mana_cost, record.mana_costs,
+            record.types, record.cmc, record.color, record.split)
+
+
+class ExtractRecordTest(unittest.TestCase):
+    """extract_record finds what parse_record finds in the html5lib tree."""
+
+    def assertSameRecord(self, html, query):
+        expected = parse_record(parse_html(html), query)
+        actual = extract_record(html, query)
+        self.assertEqual(fields(actual), fields(expected))
+        return actual
+
+    def test_card(self):
+        html = details_page(u'Test Card', u'Creature — Elf',
+                            [u'2', u'Phyrexian Blue', u'White or Blue'], 4)
+        record = self.assertSameRecord(html, u'Test Card')
+        self.assertEqual(record.mana_cost,
+                         (u'2', u'Phyrexian Blue', u'White or Blue'))
+        self.assertEqual(record.types, u'Creature — Elf')
+
+    def test_land(self):
+        html = details_page(u'Test Land', u'Basic Land — Island', [], 0)
+        record = self.assertSameRecord(html, u'Test Land')
+        self.assertEqual(record.mana_cost, ())
+
+    def test_entities(self):
+        html = details_page(u'Test &amp; Card', u'Creature &mdash; Elf',
+                            [u'1'], 1)
+        record = self.assertSameRecord(html, u'Test & Card')
+        self.assertEqual(record.name, u'Test & Card')
+
+    def test_split(self):
+        record = self.assertSameRecord(SPLIT_PAGE, u'Fire // Ice')
+        self.assertTrue(record.split)
+        self.assertEqual(record.mana_costs, frozenset([2]))
+
+    def test_no_rows(self):
+        self.assertIsNone(extract_record(u'<html><body>Not found</body>'
+                                         u'</html>', u'Nothing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import unittest
+
+import numpy
+
+from mtgdeckeditor.probability import at_least
+from mtgdeckeditor.record import CardRecord
+from mtgdeckeditor.simulation import Simulator
+
+SIMULATIONS = 20000
+
+
+def deck(lands, spells, cmc=2):
+    return Simulator([True]*lands + [False]*spells,
+                     [0]*lands + [cmc]*spells, seed=1)
+
+
+class SimulatorTest(unittest.TestCase):
+
+    def test_from_deck(self):
+        island = CardRecord(u'Island', u'Island', [], [0],
+                            u'Basic Land — Island', 0)
+        opt = CardRecord(u'Opt', u'Opt', [u'Blue'], [1], u'Instant', 1)
+        simulator = Simulator.from_deck([(3, island), (2, opt)])
+        self.assertEqual(len(simulator), 5)
+        self.assertEqual(simulator.lands.tolist(), [True]*3 + [False]*2)
+        self.assertEqual(simulator.cmcs.tolist(), [0, 0, 0, 1, 1])
+
+    def test_sample(self):
+        drawn = deck(20, 20).sample(25000, 7)
+        self.assertEqual(drawn.shape, (25000, 7))
+        # every row is drawn without replacement
+        self.assertTrue((numpy.sort(drawn, axis=1)[:, 1:] !=
+                         numpy.sort(drawn, axis=1)[:, :-1]).all())
+
+    def test_seeded(self):
+        self.assertEqual(deck(17, 23).sample(10, 7).tolist(),
+                         deck(17, 23).sample(10, 7).tolist())
+
+    def test_land_distribution(self):
+        distribution = deck(17, 23).land_distribution(SIMULATIONS)
+        self.assertEqual(len(distribution), 8)
+        self.assertAlmostEqual(distribution.sum(), 1.0)
+        # P(no land) agrees with the exact hypergeometric value
+        self.assertAlmostEqual(distribution[0], 1 - at_least(40, 17, 7),
+                               delta=0.01)
+        self.assertEqual(deck(40, 0).land_distribution(100)[7], 1.0)
+
+    def test_mulligan_rates(self):
+        rates = deck(17, 23).mulligan_rates(SIMULATIONS)
+        self.assertEqual(sorted(rates), list(range(1, 8)))
+        self.assertAlmostEqual(sum(rates.values()), 1.0)
+        self.assertGreater(rates[7], 0.8)
+        # nothing but lands is never kept until the last card
+        rates = deck(40, 0).mulligan_rates(1000)
+        self.assertEqual(rates[1], 1.0)
+
+    def test_on_curve(self):
+        self.assertEqual(deck(40, 0).on_curve(3, 1000).tolist(),
+                         [0.0, 0.0, 0.0])
+        play = deck(17, 23, cmc=2).on_curve(3, SIMULATIONS)
+        draw = deck(17, 23, cmc=2).on_curve(3, SIMULATIONS, on_play=False)
+        self.assertEqual(play[0], 0.0)
+        self.assertGreater(play[1], 0.5)
+        self.assertGreater(draw[1], play[1])
+
+    def test_report(self):
+        report = deck(17, 23).report(1000, turns=2)
+        self.assertIn('keep 7', report)
+        self.assertIn('turn 2', report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import unittest
+
+from mtgdeckeditor.curve import COLOR_INDEX, curve_matrix
+from mtgdeckeditor.record import CardRecord, mana_costs
+from mtgdeckeditor.stats import DeckStats
+
+
+def card(name, mana_cost, cmc, types=u'Instant'):
+    return CardRecord(name, name, mana_cost, mana_costs(cmc, mana_cost),
+                      types, cmc)
+
+CARDS = {
+    u'Lightning Bolt': card(u'Lightning Bolt', [u'Red'], 1),
+    u'Counterspell': card(u'Counterspell', [u'Blue', u'Blue'], 2),
+    u'Island': card(u'Island', [], 0, u'Basic Land — Island'),
+}
+
+
+class DeckStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stats = DeckStats()
+        for amount, name in ((4, u'Lightning Bolt'), (2, u'Counterspell'),
+                             (10, u'Island')):
+            self.stats.insert_row(len(self.stats.rows), amount, name)
+        for name in self.stats.unresolved():
+            self.stats.resolve(name, CARDS[name])
+
+    def assertConsistent(self):
+        """The running totals match totals computed from scratch."""
+        stats = self.stats
+        deck = [(amount, CARDS[name]) for amount, name in stats.rows]
+        self.assertEqual(stats.total, sum(amount for amount, name in deck))
+        self.assertEqual(stats.lands, sum(amount for amount, card in deck
+                                          if 'Land' in card.types))
+        self.assertEqual(stats.curve.tolist(), curve_matrix(deck).tolist())
+
+    def test_insert(self):
+        self.assertEqual(self.stats.total, 16)
+        self.assertEqual(self.stats.lands, 10)
+        self.assertEqual(self.stats.color_counts[COLOR_INDEX['r']], 4)
+        self.assertEqual(self.stats.cmc_counts[2], 2)
+        self.assertEqual(self.stats.unresolved(), [])
+        self.assertConsistent()
+
+    def test_change(self):
+        self.stats.change_row(0, 3, u'Lightning Bolt')
+        self.assertEqual(self.stats.counts[u'Lightning Bolt'], 3)
+        self.assertEqual(self.stats.color_counts[COLOR_INDEX['r']], 3)
+        self.assertConsistent()
+
+    def test_change_name(self):
+        self.stats.change_row(1, 2, u'Lightning Bolt')
+        self.assertNotIn(u'Counterspell', self.stats.counts)
+        self.assertEqual(self.stats.counts[u'Lightning Bolt'], 6)
+        self.assertEqual(self.stats.color_counts[COLOR_INDEX['u']], 0)
+
+    def test_delete(self):
+        self.stats.delete_row(2)
+        self.assertEqual(self.stats.lands, 0)
+        self.assertNotIn(u'Island', self.stats.counts)
+        self.assertConsistent()
+
+    def test_resolve_later(self):
+        self.stats.clear()
+        self.stats.insert_row(0, 4, u'Lightning Bolt')
+        self.assertEqual(self.stats.unresolved(), [u'Lightning Bolt'])
+        self.assertEqual(self.stats.curve.sum(), 0)
+        self.stats.resolve(u'Lightning Bolt', CARDS[u'Lightning Bolt'])
+        self.assertConsistent()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#       Copyright 2015 Nils Dagsson Moskopp // erlehmann and others.
+
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 3 of the License, or
+#       (at your option) any later version.
+#
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import unittest
+
+from mtgdeckeditor.typeahead import PrefixCache
+
+
+class PrefixCacheTest(unittest.TestCase):
+
+    def test_exact(self):
+        cache = PrefixCache(limit=3)
+        cache.put(u'Li', [u'Lightning Bolt', u'Lich', u'Lifelink'])
+        self.assertEqual(cache.get(u'li'),
+                         [u'Lightning Bolt', u'Lich', u'Lifelink'])
+        self.assertIsNone(cache.get(u'Ab'))
+
+    def test_complete_result_answers_longer_prefixes(self):
+        cache = PrefixCache(limit=3)
+        cache.put(u'li', [u'Lightning Bolt', u'Lich'])
+        self.assertEqual(cache.get(u'LIG'), [u'Lightning Bolt'])
+        self.assertEqual(cache.get(u'lix'), [])
+
+    def test_truncated_result_does_not(self):
+        # a full result may have left out names matching a longer prefix
+        cache = PrefixCache(limit=2)
+        cache.put(u'li', [u'Lich', u'Lifelink'])
+        self.assertIsNone(cache.get(u'lig'))
+
+    def test_eviction(self):
+        cache = PrefixCache(size=2)
+        cache.put(u'a', [u'Abundance'])
+        cache.put(u'b', [u'Bolt'])
+        cache.get(u'a')
+        cache.put(u'c', [u'Counterspell'])
+        self.assertIsNone(cache.get(u'b'))
+        self.assertEqual(cache.get(u'a'), [u'Abundance'])
+
+
+if __name__ == '__main__':
+    unittest.main()